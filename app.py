@@ -1,10 +1,8 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime
 import os
 import json
+import time
 
 # Configuration de la page
 st.set_page_config(
@@ -14,20 +12,44 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Import des scrapers
+# Import des scrapers (modules légers; pandas, plotly, bs4... sont importés par les pages qui s'en servent)
 try:
-    from scrapers.scraper_clean import CoinAfriqueScraperCleaned
-    from scrapers.web_scraper import CoinAfriqueScraperRaw
+    from scrapers.catalog import DataCatalog, ensure_data_dirs
+    from scrapers.transport import available_transports, DEFAULT_TRANSPORT
 except ImportError:
     st.error("Erreur: Scrapers non trouvés. Vérifiez les fichiers dans le dossier scrapers/")
     st.stop()
 
-# Créer les dossiers
-os.makedirs('data/cleaned', exist_ok=True)
-os.makedirs('data/raw', exist_ok=True)
-os.makedirs('data/evaluations', exist_ok=True)
+PROFILE_HELP = "cProfile et tracemalloc par étape et par page; le profil est enregistré avec les données"
+
+@st.cache_resource
+def get_catalog():
+    """Catalogue des fichiers de données partagé entre les sessions"""
+    return DataCatalog()
+
+@st.cache_resource
+def get_job_runner():
+    """Exécuteur de tâches de scraping partagé entre les sessions et les onglets"""
+    from scrapers.jobs import JobRunner
+    return JobRunner(max_workers=2)
+
+def get_session_id():
+    """Identifiant de la session Streamlit (propriétaire des tâches qu'elle lance)"""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else ""
+
+@st.cache_resource
+def get_rollups():
+    """Agrégats de tendances, complétés une fois avec les fichiers déjà présents"""
+    from scrapers.rollups import TrendRollups
+    rollups = TrendRollups()
+    rollups.backfill(get_catalog().list_files('cleaned'))
+    return rollups
 
 def main():
+    # Dossiers créés une fois par processus (pas à chaque rerun)
+    ensure_data_dirs()
     st.title("CoinAfrique Scraper")
     
     # Sidebar
@@ -45,6 +67,16 @@ def main():
             index=0
         )
         
+        st.markdown("---")
+        transports = available_transports()
+        st.selectbox(
+            "Backend HTTP",
+            transports,
+            index=transports.index(DEFAULT_TRANSPORT) if DEFAULT_TRANSPORT in transports else 0,
+            key="transport",
+            help="httpx: client asynchrone avec HTTP/2 (si h2 est installé)"
+        )
+        
         st.markdown("---")
         display_stats()
     
@@ -65,35 +97,22 @@ def display_stats():
     st.subheader("Statistiques")
     
     try:
-        # Compter les fichiers nettoyés
-        cleaned_files = 0
-        raw_files = 0
-        
-        if os.path.exists('data/cleaned'):
-            cleaned_files = len([f for f in os.listdir('data/cleaned') if f.endswith('.csv')])
-        
-        if os.path.exists('data/raw'):
-            raw_files = len([f for f in os.listdir('data/raw') if f.endswith('.csv')])
+        # Compter les fichiers depuis le catalogue (sans ceux supprimés hors de l'application)
+        get_catalog().prune()
+        counts = get_catalog().count_files()
         
         col1, col2 = st.columns(2)
         with col1:
-            st.metric("Données nettoyées", cleaned_files)
+            st.metric("Données nettoyées", counts['cleaned'])
         with col2:
-            st.metric("Données brutes", raw_files)
+            st.metric("Données brutes", counts['raw'])
         
         # Dernière activité
-        all_files = []
-        if os.path.exists('data/cleaned'):
-            cleaned_list = [f'data/cleaned/{f}' for f in os.listdir('data/cleaned') if f.endswith('.csv')]
-            all_files.extend(cleaned_list)
-        if os.path.exists('data/raw'):
-            raw_list = [f'data/raw/{f}' for f in os.listdir('data/raw') if f.endswith('.csv')]
-            all_files.extend(raw_list)
-        
-        if all_files:
+        latest = get_catalog().latest_created()
+        
+        if latest:
             try:
-                latest_file = max(all_files, key=lambda x: os.path.getctime(x))
-                latest_time = datetime.fromtimestamp(os.path.getctime(latest_file))
+                latest_time = datetime.fromtimestamp(latest)
                 st.caption(f"Dernier scraping: {latest_time.strftime('%d/%m/%Y %H:%M')}")
             except (OSError, ValueError) as e:
                 st.caption("Dernière activité: N/A")
@@ -106,6 +125,8 @@ def display_stats():
 
 def page_scraping_cleaned():
     """Page pour le scraping avec nettoyage"""
+    import pandas as pd
+    
     st.header("Scraper avec nettoyage des données")
     st.markdown("Utilise BeautifulSoup pour extraire et nettoyer les données selon les variables spécifiées.")
     
@@ -126,37 +147,54 @@ def page_scraping_cleaned():
         )
     
     with col2:
+        all_pages = st.checkbox(
+            "Toutes les pages",
+            key="clean_all_pages",
+            help="S'arrête automatiquement à la dernière page de la catégorie"
+        )
         num_pages = st.number_input(
             "Nombre de pages à scraper",
             min_value=1,
             max_value=20,
             value=1,
-            key="clean_pages"
+            key="clean_pages",
+            disabled=all_pages
         )
+        if all_pages:
+            num_pages = None
     
     # Affichage des variables
     st.info(variables_info[category])
     
+    keep_raw = st.checkbox(
+        "Conserver aussi les données brutes",
+        key="clean_keep_raw",
+        help="Chaque page est téléchargée et analysée une seule fois pour produire les deux jeux de données"
+    )
+    
+    download_images = st.checkbox(
+        "Télécharger aussi les miniatures",
+        key="clean_images",
+        help="Téléchargement borné et dédoublonné dans data/images, après le scraping"
+    )
+    
+    profile = st.checkbox(
+        "Profiler l'exécution",
+        key="clean_profile",
+        help=PROFILE_HELP
+    )
+    
     if st.button("Lancer le scraping avec nettoyage", type="primary", use_container_width=True):
         try:
-            scraper = CoinAfriqueScraperCleaned()
-            
-            with st.spinner("Scraping en cours..."):
-                data = scraper.scrape_category(category, num_pages)
-            
-            if data:
-                # Sauvegarder dans session_state pour persister les données
-                st.session_state.cleaned_scraped_data = data
-                st.session_state.cleaned_scraped_category = category
-                st.session_state.cleaned_scraper_instance = scraper
-                
-                st.success(f"{len(data)} annonces collectées avec succès!")
-                
-            else:
-                st.error("Aucune donnée collectée. Vérifiez la connexion ou réessayez.")
+            st.session_state.cleaned_job_id = get_job_runner().submit(
+                'both' if keep_raw else 'cleaned', category, num_pages, owner=get_session_id(),
+                transport=st.session_state.get("transport"), download_images=download_images, profile=profile
+            )
         except Exception as e:
             st.error(f"Erreur lors du scraping: {str(e)}")
     
+    job_running = display_job_status('cleaned', "Aucune donnée collectée. Vérifiez la connexion ou réessayez.")
+    
     if 'cleaned_scraped_data' in st.session_state and st.session_state.cleaned_scraped_data:
         data = st.session_state.cleaned_scraped_data
         df = pd.DataFrame(data)
@@ -186,6 +224,9 @@ def page_scraping_cleaned():
         st.subheader("Aperçu des données nettoyées")
         st.dataframe(df, use_container_width=True, height=300)
         
+        if st.session_state.get("cleaned_profile"):
+            display_profile_report(st.session_state.cleaned_profile)
+        
         # Sauvegarde
         st.markdown("---")
         col1, col2 = st.columns([1, 1])
@@ -196,12 +237,8 @@ def page_scraping_cleaned():
                     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                     filename = f"{st.session_state.cleaned_scraped_category}_cleaned_{timestamp}.csv"
                     
-                    # Créer le dossier s'il n'existe pas
-                    os.makedirs('data/cleaned', exist_ok=True)
-                    
-                    # Sauvegarder directement
-                    filepath = f"data/cleaned/{filename}"
-                    df.to_csv(filepath, index=False, encoding='utf-8')
+                    # Score qualité, regroupement des republications, catalogue et agrégats
+                    filepath = save_data('cleaned', df, filename, st.session_state.cleaned_scraped_category)
                     
                     if os.path.exists(filepath):
                         st.success(f"Données sauvegardées: {filename}")
@@ -233,10 +270,17 @@ def page_scraping_cleaned():
                 del st.session_state.cleaned_scraped_category
             if 'cleaned_scraper_instance' in st.session_state:
                 del st.session_state.cleaned_scraper_instance
+            st.session_state.pop('cleaned_profile', None)
+            st.session_state.pop('cleaned_profiler', None)
             st.rerun()
+    
+    display_jobs_panel('cleaned')
+    poll_jobs(job_running)
 
 def page_scraping_raw():
     """Page pour le scraping sans nettoyage"""
+    import pandas as pd
+    
     st.header("Web Scraper (sans nettoyage)")
     st.markdown("Collecte les données brutes sans traitement selon les variables spécifiées.")
     
@@ -257,37 +301,42 @@ def page_scraping_raw():
         )
     
     with col2:
+        all_pages = st.checkbox(
+            "Toutes les pages",
+            key="raw_all_pages",
+            help="S'arrête automatiquement à la dernière page de la catégorie"
+        )
         num_pages = st.number_input(
             "Nombre de pages à scraper",
             min_value=1,
             max_value=20,
             value=1,
-            key="raw_pages"
+            key="raw_pages",
+            disabled=all_pages
         )
+        if all_pages:
+            num_pages = None
     
     # Affichage des variables
     st.info(variables_info[category])
     
+    profile = st.checkbox(
+        "Profiler l'exécution",
+        key="raw_profiling",
+        help=PROFILE_HELP
+    )
+    
     if st.button("Lancer le web scraping (sans nettoyage)", type="primary", use_container_width=True):
         try:
-            scraper = CoinAfriqueScraperRaw()
-            
-            with st.spinner("Web scraping en cours..."):
-                data = scraper.scrape_category(category, num_pages)
-            
-            if data:
-                # Sauvegarder dans session_state pour persister les données
-                st.session_state.raw_scraped_data = data
-                st.session_state.raw_scraped_category = category
-                st.session_state.raw_scraper_instance = scraper
-                
-                st.success(f"{len(data)} annonces collectées (données brutes)!")
-                
-            else:
-                st.error("Aucune donnée collectée.")
+            st.session_state.raw_job_id = get_job_runner().submit(
+                'raw', category, num_pages, owner=get_session_id(), transport=st.session_state.get("transport"),
+                profile=profile
+            )
         except Exception as e:
             st.error(f"Erreur lors du scraping: {str(e)}")
     
+    job_running = display_job_status('raw', "Aucune donnée collectée.")
+    
     if 'raw_scraped_data' in st.session_state and st.session_state.raw_scraped_data:
         data = st.session_state.raw_scraped_data
         df = pd.DataFrame(data)
@@ -312,6 +361,9 @@ def page_scraping_raw():
         st.subheader("Aperçu des données brutes")
         st.dataframe(df, use_container_width=True, height=300)
         
+        if st.session_state.get("raw_profile"):
+            display_profile_report(st.session_state.raw_profile)
+        
         # Sauvegarde
         st.markdown("---")
         col1, col2 = st.columns([1, 1])
@@ -322,12 +374,7 @@ def page_scraping_raw():
                     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                     filename = f"{st.session_state.raw_scraped_category}_raw_{timestamp}.csv"
                     
-                    # Créer le dossier s'il n'existe pas
-                    os.makedirs('data/raw', exist_ok=True)
-                    
-                    # Sauvegarder directement
-                    filepath = f"data/raw/{filename}"
-                    df.to_csv(filepath, index=False, encoding='utf-8')
+                    filepath = save_data('raw', df, filename, st.session_state.raw_scraped_category)
                     
                     if os.path.exists(filepath):
                         st.success(f"Données sauvegardées: {filename}")
@@ -359,18 +406,175 @@ def page_scraping_raw():
                 del st.session_state.raw_scraped_category
             if 'raw_scraper_instance' in st.session_state:
                 del st.session_state.raw_scraper_instance
+            st.session_state.pop('raw_profile', None)
+            st.session_state.pop('raw_profiler', None)
             st.rerun()
+    
+    display_jobs_panel('raw')
+    poll_jobs(job_running)
+
+def load_job_results(job):
+    """Copie les résultats d'une tâche dans la session"""
+    data = job.results()
+    if job.mode == 'both':
+        # Une tâche combinée alimente les deux pages de scraping
+        st.session_state.raw_scraped_data = job.raw_results()
+        st.session_state.raw_scraped_category = job.category
+        st.session_state.raw_job_id = job.job_id
+        st.session_state.raw_loaded_job = job.job_id
+    mode = job.output_modes[0]
+    st.session_state[f"{mode}_scraped_data"] = data
+    st.session_state[f"{mode}_scraped_category"] = job.category
+    st.session_state[f"{mode}_loaded_job"] = job.job_id
+    for output_mode in job.output_modes:
+        st.session_state[f"{output_mode}_profile"] = job.profile_report
+        st.session_state[f"{output_mode}_profiler"] = job.profiler
+    return data
+
+def display_job_status(mode, empty_message):
+    """Affiche la progression de la tâche de la session; retourne True si elle est en cours"""
+    import pandas as pd
+    
+    job = get_job_runner().get(st.session_state.get(f"{mode}_job_id"))
+    if not job:
+        return False
+    
+    if job.is_active:
+        st.progress(job.progress)
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            if job.stage == "miniatures":
+                st.caption(f"Tâche {job.job_id}: miniatures {job.images_done}/{job.images_total}")
+            else:
+                st.caption(
+                    f"Tâche {job.job_id} ({job.status}): page {job.pages_done}/{job.total_pages or '?'} "
+                    f"de {job.category}, {job.result_count} annonces collectées"
+                )
+        with col2:
+            if job.owner == get_session_id():
+                if st.button("Annuler", key=f"cancel_{mode}_{job.job_id}", use_container_width=True):
+                    get_job_runner().cancel(job.job_id, get_session_id())
+        
+        # Résultats partiels disponibles pendant le scraping
+        if job.result_count:
+            with st.expander("Résultats partiels"):
+                st.dataframe(pd.DataFrame(job.results()), use_container_width=True, height=200)
+        return True
+    
+    if st.session_state.get(f"{mode}_loaded_job") != job.job_id:
+        data = load_job_results(job)
+        for error in job.errors:
+            st.warning(error)
+        if data:
+            st.success(f"{len(data)} annonces collectées ({job.status})!")
+        else:
+            st.error(empty_message)
+        if job.image_report:
+            display_image_report(job.image_report)
+    return False
+
+def display_image_report(report):
+    """Résumé du téléchargement des miniatures"""
+    from scrapers.images import DOWNLOADED, DUPLICATE, NOT_MODIFIED
+    
+    counts = report['counts']
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Miniatures téléchargées", counts[DOWNLOADED])
+    with col2:
+        st.metric("Doublons / inchangées", counts[DUPLICATE] + counts[NOT_MODIFIED])
+    with col3:
+        st.metric("Images/s", f"{report['images_per_second']:.1f}")
+    with col4:
+        st.metric("Débit", f"{report['kb_per_second']:.0f} Ko/s")
+
+def display_profile_report(report):
+    """Étapes, points chauds et pic d'allocations d'un scraping profilé"""
+    with st.expander("Profil d'exécution"):
+        st.write("**Temps et pic mémoire par étape**")
+        st.dataframe(report['stages'], use_container_width=True, hide_index=True)
+        
+        if report['pages']:
+            st.write("**Par page** (secondes, pic en Ko)")
+            st.dataframe(report['pages'], use_container_width=True, hide_index=True)
+        
+        st.write("**Points chauds** (temps propre, hors fonctions appelées)")
+        st.dataframe(report['hotspots'], use_container_width=True, hide_index=True)
+        
+        if report['peak_stage']:
+            st.write(f"**Pic d'allocations:** {report['peak_kb']:,.1f} Ko pendant « {report['peak_stage']} »")
+            st.dataframe(report['peak_allocations'], use_container_width=True, hide_index=True)
+
+def save_data(mode, df, filename, category):
+    """Sauvegarde un résultat de scraping avec le catalogue, les agrégats et le profil de la session"""
+    from scrapers.base import save_dataset
+    from scrapers.profiling import NULL_PROFILER
+    
+    profiler = st.session_state.get(f"{mode}_profiler") or NULL_PROFILER
+    filepath = save_dataset(
+        df, filename, mode, category=category, profiler=profiler,
+        catalog=get_catalog(), rollups=get_rollups() if mode == 'cleaned' else None
+    )
+    if profiler.enabled:
+        st.caption("Profil enregistré à côté des données (.prof et _profile.json)")
+    return filepath
+
+def display_jobs_panel(mode):
+    """Liste des tâches de toutes les sessions (permet de récupérer une tâche après rafraîchissement)
+
+    Seule la session qui a lancé une tâche peut l'annuler.
+    """
+    jobs = get_job_runner().list_jobs(mode)
+    if not jobs:
+        return
+    
+    with st.expander(f"Tâches en arrière-plan ({len(jobs)})"):
+        for job in jobs:
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                created = datetime.fromtimestamp(job.created).strftime('%d/%m/%Y %H:%M:%S')
+                st.write(
+                    f"**{job.job_id}** · {job.category} · {job.status} · "
+                    f"{job.pages_done}/{job.total_pages or '?'} pages · {job.result_count} annonces"
+                )
+                st.caption(f"Créée le {created}")
+            with col2:
+                if job.is_active:
+                    if job.owner != get_session_id():
+                        st.caption("Autre session")
+                    elif st.button("Annuler", key=f"cancel_panel_{job.job_id}", use_container_width=True):
+                        get_job_runner().cancel(job.job_id, get_session_id())
+                        st.rerun()
+                elif job.result_count:
+                    if st.button("Charger", key=f"load_{job.job_id}", use_container_width=True):
+                        st.session_state[f"{mode}_job_id"] = job.job_id
+                        load_job_results(job)
+                        st.rerun()
+
+def poll_jobs(job_running, interval=2):
+    """Relance le script périodiquement tant qu'une tâche de la session est en cours"""
+    if job_running:
+        time.sleep(interval)
+        st.rerun()
 
 def page_dashboard():
     """Dashboard d'analyse des données nettoyées uniquement"""
+    import pandas as pd
+    import plotly.express as px
+    from scrapers.gazetteer import get_gazetteer
+    from scrapers.quality import score_listings
+    
     st.header("Dashboard des données")
     st.markdown("Visualisation et analyse des **données nettoyées** uniquement.")
     
+    view = st.radio("Vue", ["Fichier", "Tendances"], horizontal=True, key="dashboard_view")
+    if view == "Tendances":
+        display_trends()
+        return
+    
     # Sélection du fichier
     try:
-        cleaned_files = []
-        if os.path.exists('data/cleaned'):
-            cleaned_files = [f for f in os.listdir('data/cleaned') if f.endswith('.csv')]
+        cleaned_files = get_catalog().list_files('cleaned')
         
         if not cleaned_files:
             st.warning("Aucun fichier de données nettoyées trouvé. Effectuez d'abord un scraping avec nettoyage.")
@@ -379,21 +583,50 @@ def page_dashboard():
         selected_file = st.selectbox(
             "Choisir un fichier de données nettoyées",
             cleaned_files,
-            format_func=lambda x: f"{x} ({get_file_size(f'data/cleaned/{x}')})"
+            format_func=lambda x: f"{x['filename']} ({format_file_size(x['size'])})"
         )
         
-        df = pd.read_csv(f"data/cleaned/{selected_file}")
+        try:
+            df = pd.read_csv(selected_file['path'])
+        except FileNotFoundError:
+            # Fichier supprimé hors de l'application: retiré du catalogue
+            get_catalog().remove(selected_file['path'])
+            st.rerun()
         
         if df.empty:
             st.warning("Le fichier sélectionné est vide.")
             return
         
+        # Quasi-doublons: une seule annonce par groupe de republications
+        duplicates = 0
+        if 'cluster_id' in df.columns:
+            if st.checkbox("Regrouper les annonces republiées", value=True, key="dashboard_group_duplicates"):
+                total = len(df)
+                df = df.drop_duplicates(subset='cluster_id', keep='first')
+                duplicates = total - len(df)
+        
+        # Contrôle qualité: prix de téléphone ou de surface, loyers parmi les ventes, prix aberrants
+        if 'quarantined' not in df.columns:
+            # Anciens fichiers: contrôle à la volée
+            df = score_listings(df, selected_file['category'])
+        quarantine = df['quarantined'].fillna(False).astype(bool)
+        if quarantine.any():
+            if st.checkbox("Exclure les annonces en quarantaine", value=True, key="dashboard_exclude_quarantine"):
+                with st.expander(f"{int(quarantine.sum())} annonces en quarantaine, exclues des statistiques"):
+                    st.dataframe(
+                        df.loc[quarantine, [c for c in ('titre', 'prix', 'type_annonce', 'quality_score', 'quality_flags')
+                                            if c in df.columns]],
+                        use_container_width=True, height=200
+                    )
+                df = df[~quarantine]
+        
         # Informations générales
         st.subheader("Vue d'ensemble")
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("Total annonces", len(df))
+            st.metric("Total annonces", len(df), delta=f"-{duplicates} doublons" if duplicates else None,
+                      delta_color="off")
         with col2:
             st.metric("Variables", len(df.columns))
         with col3:
@@ -413,7 +646,16 @@ def page_dashboard():
             # Analyse des localisations
             if 'adresse' in df.columns:
                 st.write("**Top des localisations**")
-                adresses = df['adresse'].value_counts().head(10)
+                if 'quartier' not in df.columns:
+                    # Anciens fichiers: normalisation à la volée
+                    gazetteer = get_gazetteer()
+                    places = [gazetteer.resolve(adresse) for adresse in df['adresse'].fillna('')]
+                    df = df.assign(quartier=[q or '' for q, _ in places], ville=[v or '' for _, v in places])
+                # Quartier normalisé, sinon ville, sinon adresse brute
+                localisations = df['quartier'].fillna('').astype(str)
+                for fallback in ('ville', 'adresse'):
+                    localisations = localisations.where(localisations != '', df[fallback].fillna('').astype(str))
+                adresses = localisations[localisations != ''].value_counts().head(10)
                 if not adresses.empty:
                     fig = px.bar(
                         x=adresses.values,
@@ -471,6 +713,77 @@ def page_dashboard():
     except Exception as e:
         st.error(f"Erreur lors du chargement: {str(e)}")
 
+def display_trends():
+    """Tendances du marché sur plusieurs scrapings (lit uniquement les agrégats)"""
+    import pandas as pd
+    import plotly.express as px
+    from scrapers.rollups import ALL_QUARTIERS, DAY, WEEK
+    
+    try:
+        rollups = get_rollups()
+        dimensions = rollups.dimensions()
+        
+        if not dimensions['category']:
+            st.warning("Aucune tendance disponible. Sauvegardez d'abord des données nettoyées.")
+            return
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            category = st.selectbox("Catégorie", dimensions['category'], key="trends_category")
+        with col2:
+            type_annonce = st.selectbox("Type d'annonce", dimensions['type_annonce'], key="trends_type")
+        with col3:
+            quartiers = [ALL_QUARTIERS] + [q for q in dimensions['quartier'] if q not in (ALL_QUARTIERS, '')]
+            quartier = st.selectbox(
+                "Quartier", quartiers, key="trends_quartier",
+                format_func=lambda q: "Tous les quartiers" if q == ALL_QUARTIERS else q
+            )
+        with col4:
+            period = st.selectbox(
+                "Granularité", [WEEK, DAY], key="trends_period",
+                format_func=lambda p: "Semaine" if p == WEEK else "Jour"
+            )
+        
+        trends = pd.DataFrame(rollups.series(period, category, type_annonce, quartier))
+        if trends.empty:
+            st.info("Aucune donnée pour cette sélection.")
+            return
+        
+        latest = trends.iloc[-1]
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Annonces (dernière période)", int(latest['listings']))
+        with col2:
+            st.metric("Nouvelles", int(latest['new_listings']))
+        with col3:
+            st.metric("Retirées", int(latest['removed_listings']))
+        with col4:
+            if pd.notna(latest['price_m2_q50']):
+                st.metric("Prix médian / m²", f"{latest['price_m2_q50']:,.0f}")
+            elif pd.notna(latest['price_q50']):
+                st.metric("Prix médian", f"{latest['price_q50']:,.0f}")
+        
+        # Prix au m² si disponible (terrains), sinon prix
+        name = 'price_m2' if trends['price_m2_count'].sum() else 'price'
+        title = "Prix au m²" if name == 'price_m2' else "Prix"
+        fig = px.line(
+            trends, x='period_start',
+            y=[f'{name}_q25', f'{name}_q50', f'{name}_q75'],
+            markers=True, title=f"{title} (quartiles)"
+        )
+        fig.update_layout(xaxis_title="Période", yaxis_title=title, height=400, legend_title_text="")
+        st.plotly_chart(fig, use_container_width=True)
+        
+        fig = px.bar(
+            trends, x='period_start', y=['new_listings', 'removed_listings'],
+            barmode='group', title="Nouvelles et retirées"
+        )
+        fig.update_layout(xaxis_title="Période", yaxis_title="Annonces", height=350, legend_title_text="")
+        st.plotly_chart(fig, use_container_width=True)
+        
+    except Exception as e:
+        st.error(f"Erreur lors du chargement des tendances: {str(e)}")
+
 def page_downloads():
     """Page de téléchargement des données"""
     st.header("Téléchargements")
@@ -478,51 +791,55 @@ def page_downloads():
     
     # Données nettoyées
     st.subheader("Données nettoyées")
-    display_files_for_download('data/cleaned', "Aucun fichier de données nettoyées.")
+    display_files_for_download('cleaned', "Aucun fichier de données nettoyées.")
     
     st.markdown("---")
     
     # Données brutes
     st.subheader("Données brutes (Web Scraper)")
-    display_files_for_download('data/raw', "Aucun fichier de données brutes.")
+    display_files_for_download('raw', "Aucun fichier de données brutes.")
 
-def display_files_for_download(folder_path, empty_message):
+def display_files_for_download(mode, empty_message):
     """Affiche les fichiers pour téléchargement"""
-    if not os.path.exists(folder_path):
-        st.info(empty_message)
-        return
-    
-    files = [f for f in os.listdir(folder_path) if f.endswith('.csv')]
+    files = get_catalog().list_files(mode)
     
     if not files:
         st.info(empty_message)
         return
     
-    for file in files:
+    for entry in files:
+        file = entry['filename']
         col1, col2, col3 = st.columns([3, 1, 1])
         
         with col1:
             st.write(f"**{file}**")
             try:
-                file_date = datetime.fromtimestamp(os.path.getctime(f"{folder_path}/{file}"))
-                st.caption(f"Créé le {file_date.strftime('%d/%m/%Y à %H:%M')}")
+                file_date = datetime.fromtimestamp(entry['created'])
+                caption = f"Créé le {file_date.strftime('%d/%m/%Y à %H:%M')}"
+                if entry['rows'] is not None:
+                    caption += f" · {entry['rows']} lignes"
+                st.caption(caption)
             except:
                 st.caption("Date inconnue")
         
         with col2:
-            st.write(get_file_size(f"{folder_path}/{file}"))
+            st.write(format_file_size(entry['size']))
         
         with col3:
             try:
-                with open(f"{folder_path}/{file}", 'rb') as f:
+                with open(entry['path'], 'rb') as f:
                     st.download_button(
                         label="Télécharger",
                         data=f.read(),
                         file_name=file,
                         mime='text/csv',
-                        key=f"download_{file}",
+                        key=f"download_{entry['path']}",
                         use_container_width=True
                     )
+            except FileNotFoundError:
+                # Fichier supprimé hors de l'application
+                get_catalog().remove(entry['path'])
+                st.caption("Fichier introuvable")
             except Exception as e:
                 st.error(f"Erreur: {str(e)}")
 
@@ -547,18 +864,16 @@ def page_evaluation():
     
     
 # Fonctions utilitaires
-def get_file_size(filepath):
-    """Retourne la taille d'un fichier formatée"""
-    try:
-        size = os.path.getsize(filepath)
-        if size < 1024:
-            return f"{size} B"
-        elif size < 1024 * 1024:
-            return f"{size/1024:.1f} KB"
-        else:
-            return f"{size/(1024*1024):.1f} MB"
-    except:
+def format_file_size(size):
+    """Formate une taille en octets"""
+    if size is None:
         return "N/A"
+    if size < 1024:
+        return f"{size} B"
+    elif size < 1024 * 1024:
+        return f"{size/1024:.1f} KB"
+    else:
+        return f"{size/(1024*1024):.1f} MB"
 
 def extract_numbers_from_column(df, column):
     """Extrait les nombres d'une colonne"""
@@ -0,0 +1,112 @@
+"""Mesure le coût de démarrage de l'application (imports et exécution du script)
+
+- démarrage à froid: `python -X importtime` sur l'exécution de app.py dans
+  un processus neuf (temps d'import cumulé, principaux modules, durée totale);
+- rerun: Streamlit réexécute app.py (compilé une fois) à chaque interaction,
+  avec les modules déjà chargés; on mesure la durée de ces réexécutions;
+- pages: modules lourds chargés après l'affichage de chaque page.
+
+Les appels Streamlit s'exécutent hors serveur (mode "bare"): ils ne dessinent
+rien mais leur coût Python est compté. Chaque mesure tourne dans un dossier
+temporaire: les fichiers créés par l'application (data/catalog.db...) ne
+touchent pas le dépôt.
+
+Usage: python benchmarks/bench_startup.py [--reruns 50] [--top 10]
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, 'app.py')
+
+HEAVY_MODULES = ['pandas', 'numpy', 'plotly', 'bs4', 'requests', 'httpx']
+
+PAGES = {
+    'Évaluation': 'page_evaluation',
+    'Téléchargements': 'page_downloads',
+    'Dashboard': 'page_dashboard'
+}
+
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+# Exécuté dans un processus neuf; écrit un résultat JSON sur la dernière ligne de stdout
+CHILD = """
+import json, logging, os, runpy, sys, time, warnings
+warnings.filterwarnings('ignore')
+logging.disable(logging.CRITICAL)
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+namespace = runpy.run_path({app!r}, run_name='bench')
+cold = time.perf_counter() - start
+# Comme Streamlit: script compilé une fois, réexécuté dans un espace de noms neuf
+with open({app!r}, encoding='utf-8') as f:
+    code = compile(f.read(), {app!r}, 'exec')
+reruns = []
+for _ in range({reruns}):
+    start = time.perf_counter()
+    exec(code, {{'__name__': 'bench', '__file__': {app!r}}})
+    reruns.append(time.perf_counter() - start)
+page = {page!r}
+if page:
+    namespace[page]()
+loaded = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{'cold': cold, 'reruns': reruns, 'loaded': loaded}}))
+"""
+
+
+def run_child(reruns: int = 0, page: str = '', importtime: bool = False):
+    code = CHILD.format(root=ROOT, app=APP, reruns=reruns, page=page, heavy=HEAVY_MODULES)
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', code]
+    with tempfile.TemporaryDirectory(prefix='bench_startup_') as workdir:
+        result = subprocess.run(command, capture_output=True, text=True, cwd=workdir)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def parse_importtime(stderr: str):
+    """(temps d'import total en µs, [(cumulé µs, module)] des imports de premier niveau)"""
+    total, top_level = 0, []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        total += int(self_us)
+        if len(indent) == 1:
+            top_level.append((int(cumulative_us), module))
+    return total, sorted(top_level, reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reruns', type=int, default=50)
+    parser.add_argument('--top', type=int, default=10, help="Nombre de modules affichés")
+    args = parser.parse_args()
+
+    result, stderr = run_child(importtime=True)
+    total, top_level = parse_importtime(stderr)
+    print(f"Démarrage à froid: {result['cold'] * 1000:.0f} ms d'exécution de app.py, "
+          f"{total / 1000:.0f} ms d'imports (-X importtime)")
+    print(f"Modules lourds chargés: {', '.join(result['loaded']) or 'aucun'}")
+    for cumulative, module in top_level[:args.top]:
+        print(f"  {cumulative / 1000:>8.1f} ms  {module}")
+
+    result, _ = run_child(reruns=args.reruns)
+    reruns = sorted(result['reruns'])
+    print(f"Rerun ({args.reruns}x): médiane {reruns[len(reruns) // 2] * 1000:.2f} ms, "
+          f"max {reruns[-1] * 1000:.2f} ms")
+
+    for label, function in PAGES.items():
+        result, _ = run_child(page=function)
+        print(f"Page {label}: {result['cold'] * 1000:.0f} ms au démarrage, "
+              f"modules lourds après affichage: {', '.join(result['loaded']) or 'aucun'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Compare les backends HTTP (requests / httpx) sur un serveur local
+
+Le serveur renvoie une page de catégorie factice compressée en gzip, en
+HTTP/1.1 keep-alive, pour mesurer le coût du transport seul (sans réseau).
+
+Usage: python benchmarks/bench_transport.py [--requests 200] [--size 150000] [--latency 0.05]
+"""
+import argparse
+import gzip
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapers.transport import TRANSPORTS, available_transports
+
+
+def make_page(size: int) -> bytes:
+    card = (
+        '<div class="card"><a href="/annonce/villas/villa-{i}" title="Villa {i} 4 pièces">'
+        '<img src="https://images.coinafrique.com/thumb_{i}.jpg" alt="Villa 4 pièces 250 m2"></a>'
+        '<p>location_on Almadies, Dakar</p><p>150 000 000 CFA</p></div>'
+    )
+    body, i = [], 0
+    while sum(len(part) for part in body) < size:
+        body.append(card.format(i=i))
+        i += 1
+    return f"<html><body>{''.join(body)}</body></html>".encode('utf-8')
+
+
+def start_server(page: bytes, latency: float = 0.0):
+    compressed = gzip.compress(page)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Évite les 40 ms de délai Nagle / ACK retardé entre en-têtes et corps
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            if latency:
+                time.sleep(latency)
+            use_gzip = 'gzip' in self.headers.get('Accept-Encoding', '')
+            body = compressed if use_gzip else page
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            if use_gzip:
+                self.send_header('Content-Encoding', 'gzip')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def bench(transport, urls, expected_size):
+    start = time.perf_counter()
+    for url in urls:
+        assert len(transport.get(url)) == expected_size
+    sequential = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = transport.get_many(urls)
+    concurrent = time.perf_counter() - start
+    assert all(len(r) == expected_size for r in results)
+
+    return sequential, concurrent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--size', type=int, default=150000, help="Taille de la page non compressée (octets)")
+    parser.add_argument('--pool-size', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0.0, help="Délai de réponse simulé du serveur (secondes)")
+    args = parser.parse_args()
+
+    page = make_page(args.size)
+    server = start_server(page, args.latency)
+    base = f"http://127.0.0.1:{server.server_address[1]}/categorie/villas"
+    urls = [f"{base}?page={i}" for i in range(1, args.requests + 1)]
+
+    print(
+        f"{args.requests} requêtes, page de {len(page)} octets (gzip), "
+        f"pool de {args.pool_size}, latence {args.latency * 1000:.0f} ms"
+    )
+    print(f"{'backend':<10}{'séquentiel':>14}{'req/s':>10}{'concurrent':>14}{'req/s':>10}")
+    for name in available_transports():
+        transport = TRANSPORTS[name](pool_size=args.pool_size)
+        try:
+            transport.get(urls[0])  # échauffement (connexion)
+            sequential, concurrent = bench(transport, urls, len(page))
+        finally:
+            transport.close()
+        print(
+            f"{name:<10}{sequential:>13.2f}s{args.requests / sequential:>10.0f}"
+            f"{concurrent:>13.2f}s{args.requests / concurrent:>10.0f}"
+        )
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
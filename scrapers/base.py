@@ -0,0 +1,334 @@
+import time
+import re
+import json
+import hashlib
+import unicodedata
+from typing import List, Dict, Optional, Callable, TYPE_CHECKING
+import os
+import threading
+from scrapers.catalog import DataCatalog, DATA_DIRS
+from scrapers.transport import get_transport
+from scrapers.profiling import NULL_PROFILER, FETCH, PARSE, CARDS, RECORDS, QUALITY, SAVE
+
+# bs4, pandas et streamlit sont importés à la première utilisation:
+# charger un scraper (ou normalize_text) ne coûte rien tant qu'on ne scrape pas
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+# Motifs de prix, du plus précis au plus permissif
+PRICE_PATTERNS = [
+    re.compile(r'(\d+(?:\s\d+)*)\s*(?:CFA|F\s*CFA|FCFA)', re.IGNORECASE),
+    re.compile(r'(\d+(?:\.\d+)?)\s*(?:millions?|M)', re.IGNORECASE),
+    re.compile(r'(\d+[\d\s]*)', re.IGNORECASE)
+]
+
+THUMB_PATTERN = re.compile(r'thumb_\d+')
+ANNONCE_PATTERN = re.compile(r'/annonce/')
+PAGE_PARAM_PATTERN = re.compile(r'[?&]page=(\d+)')
+
+# Arrêt après ce nombre d'échecs de chargement consécutifs
+MAX_CONSECUTIVE_ERRORS = 3
+
+
+def normalize_text(text: str) -> str:
+    """Minuscules, sans accents ni ponctuation"""
+    # Ligatures non décomposées par NFKD (Sacré-Cœur)
+    text = str(text or '').replace('œ', 'oe').replace('Œ', 'Oe').replace('æ', 'ae').replace('Æ', 'Ae')
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', ' ', text.lower()).strip()
+
+
+def listing_key(listing: Dict) -> str:
+    """Identifiant stable d'une annonce (lien, sinon image, sinon contenu)"""
+    for field in ('lien_annonce', 'image_lien'):
+        if listing.get(field):
+            return listing[field]
+    content = json.dumps(listing, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+def save_dataset(data, filename: str, mode: str, category: str = "", profiler=NULL_PROFILER,
+                 catalog: Optional[DataCatalog] = None, rollups=None) -> str:
+    """Écrit un jeu de données dans data/<mode>/filename et met à jour catalogue et agrégats
+
+    data est une liste d'enregistrements ou un DataFrame. Pour les données
+    nettoyées, le score qualité définitif et les cluster_id sont calculés sur
+    le jeu complet avant l'écriture, puis les agrégats de tendances sont mis
+    à jour. catalog et rollups permettent de réutiliser des instances
+    partagées (application). Retourne le chemin du fichier, "" si data est vide.
+    """
+    if len(data) == 0:
+        return ""
+
+    import pandas as pd
+
+    category = category or filename.split('_')[0]
+    folder = DATA_DIRS[mode]
+    filepath = f"{folder}/{filename}"
+    with profiler.stage(SAVE):
+        df = pd.DataFrame(data)
+        if mode == 'cleaned':
+            # Score qualité définitif, calculé sur le jeu complet
+            from scrapers.quality import score_listings
+            df = score_listings(df, category)
+            # Regroupement des annonces republiées (colonne cluster_id)
+            from scrapers.dedup import add_cluster_ids
+            df = add_cluster_ids(df)
+        os.makedirs(folder, exist_ok=True)
+        df.to_csv(filepath, index=False, encoding='utf-8')
+        (catalog or DataCatalog()).register_dataframe(filepath, df, mode=mode, category=category)
+        if mode == 'cleaned':
+            # Agrégats de tendances (prix, nouvelles annonces...) mis à jour à chaque sauvegarde
+            if rollups is None:
+                from scrapers.rollups import TrendRollups
+                rollups = TrendRollups()
+            rollups.update(df, category, source=filepath)
+
+    # Profil enregistré à côté des données (rien si le profilage est désactivé)
+    profiler.save(filepath)
+    return filepath
+
+
+class CoinAfriqueScraperBase:
+    """Socle commun des scrapers: transport, téléchargement et découpage des pages
+
+    Les sous-classes implémentent build_record() pour transformer une carte
+    d'annonce (voir parse_cards) en enregistrement.
+    """
+
+    # Dossier de sauvegarde (clé de DATA_DIRS) et libellé de progression
+    mode = 'cleaned'
+    label = "Scraping"
+
+    def __init__(self, base_url: str = "https://sn.coinafrique.com", silent: bool = False, transport=None,
+                 profiler=None):
+        self.base_url = base_url
+        # silent=True: erreurs collectées dans self.errors sans appel à Streamlit (tâches en arrière-plan)
+        self.silent = silent
+        self.errors: List[str] = []
+        # Transport HTTP partagé (connexions réutilisées entre les scrapings)
+        self.transport = transport or get_transport()
+        # Profil par étape et par page (ScrapeProfiler); désactivé par défaut, sans coût
+        self.profiler = profiler or NULL_PROFILER
+
+        self.category_urls = {
+            'villas': f"{self.base_url}/categorie/villas",
+            'terrains': f"{self.base_url}/categorie/terrains",
+            'appartements': f"{self.base_url}/categorie/appartements"
+        }
+
+    def get_page_content(self, url: str, page_num: int = 1) -> Optional['BeautifulSoup']:
+        """Récupère le contenu d'une page"""
+        from bs4 import BeautifulSoup
+
+        try:
+            if page_num > 1:
+                url = f"{url}?page={page_num}"
+
+            with self.profiler.stage(FETCH, page_num):
+                content = self.transport.get(url)
+            with self.profiler.stage(PARSE, page_num):
+                return BeautifulSoup(content, 'html.parser')
+        except Exception as e:
+            self.report_error(f"Erreur lors du chargement de la page {page_num}: {str(e)}")
+            return None
+
+    def report_error(self, message: str) -> None:
+        """Signale une erreur (Streamlit ou liste d'erreurs en mode silencieux)"""
+        self.errors.append(message)
+        if not self.silent:
+            import streamlit as st
+            st.error(message)
+
+    def parse_cards(self, soup: 'BeautifulSoup') -> List[Dict]:
+        """Découpe une page en cartes d'annonces (éléments bruts communs à tous les scrapers)"""
+        cards = []
+
+        # Trouver les images d'annonces
+        images = soup.find_all('img', src=THUMB_PATTERN)
+
+        for img in images:
+            try:
+                card = {
+                    'image_lien': img.get('src', ''),
+                    'description': img.get('alt', ''),
+                    'container_text': None,
+                    'link_href': None,
+                    'link_title': '',
+                    'link_text': '',
+                    'prix': ''
+                }
+
+                # Trouver le conteneur parent
+                container = img.find_parent(['div', 'article', 'section'])
+
+                if container:
+                    # Lien vers l'annonce
+                    link = container.find('a', href=ANNONCE_PATTERN)
+                    if link:
+                        card['link_href'] = link.get('href', '')
+                        card['link_title'] = link.get('title', '')
+                        card['link_text'] = link.text
+
+                    # Texte complet du conteneur
+                    container_text = container.get_text()
+                    card['container_text'] = container_text
+
+                    for pattern in PRICE_PATTERNS:
+                        price_match = pattern.search(container_text)
+                        if price_match:
+                            card['prix'] = price_match.group(0)
+                            break
+
+                cards.append(card)
+
+            except Exception:
+                continue
+
+        return cards
+
+    def build_record(self, card: Dict, category: str) -> Dict:
+        raise NotImplementedError
+
+    def build_records(self, cards: List[Dict], category: str) -> List[Dict]:
+        listings_data = []
+        for card in cards:
+            try:
+                listings_data.append(self.build_record(card, category))
+            except Exception:
+                continue
+        return listings_data
+
+    def check_quality(self, records: List[Dict], category: str) -> List[Dict]:
+        """Contrôle qualité d'un lot d'annonces (aucun par défaut, voir scrapers.quality)"""
+        return records
+
+    def extract_listings_from_page(self, soup: 'BeautifulSoup', category: str = "") -> List[Dict]:
+        """Extrait les annonces d'une page"""
+        return self.check_quality(self.build_records(self.parse_cards(soup), category), category)
+
+    def find_last_page(self, soup: 'BeautifulSoup') -> Optional[int]:
+        """Plus grand numéro de page annoncé par la pagination de la page (None si absente)"""
+        pages = []
+
+        for link in soup.find_all('a', href=PAGE_PARAM_PATTERN):
+            pages.append(int(PAGE_PARAM_PATTERN.search(link['href']).group(1)))
+
+        # Numéros affichés dans un bloc de pagination (liens sans ?page=, ex. javascript)
+        for block in soup.find_all(class_=re.compile(r'pagination')):
+            pages.extend(int(number) for number in re.findall(r'\b\d+\b', block.get_text(' ')))
+
+        return max(pages) if pages else None
+
+    def scrape_category(self, category: str, num_pages: Optional[int] = 1,
+                        progress_callback: Optional[Callable[[int, int, List[Dict]], None]] = None,
+                        stop_event: Optional[threading.Event] = None) -> List[Dict]:
+        """Scrape une catégorie complète
+
+        num_pages=None parcourt toutes les pages. Dans tous les cas le scraping
+        s'arrête à la première page vide ou sans annonce nouvelle pour ce
+        parcours, et à la dernière page annoncée par la pagination.
+
+        Sans progress_callback, la progression est affichée avec Streamlit.
+        Sinon progress_callback(page, total_pages, page_data) est appelé après chaque page
+        (total_pages est estimé d'après la pagination en mode toutes pages)
+        et stop_event permet d'interrompre le scraping entre deux pages.
+        """
+
+        if category not in self.category_urls:
+            self.report_error(f"Catégorie '{category}' non supportée")
+            return []
+
+        all_data = []
+        url = self.category_urls[category]
+
+        show_progress = progress_callback is None
+        if show_progress:
+            import streamlit as st
+            progress_bar = st.progress(0)
+            status_text = st.empty()
+
+        last_page = None
+        # Images des annonces déjà vues pendant ce parcours
+        seen_images = set()
+        consecutive_errors = 0
+        page = 1
+
+        while num_pages is None or page <= num_pages:
+            if stop_event is not None and stop_event.is_set():
+                break
+
+            total_pages = num_pages or max(last_page or page, page)
+
+            if show_progress:
+                status_text.text(f"{self.label} page {page}/{num_pages or '?'} de {category}...")
+
+            soup = self.get_page_content(url, page)
+            if not soup:
+                if not show_progress:
+                    progress_callback(page, total_pages, [])
+                consecutive_errors += 1
+                if consecutive_errors >= MAX_CONSECUTIVE_ERRORS:
+                    break
+                self._pause(stop_event)
+                page += 1
+                continue
+            consecutive_errors = 0
+
+            with self.profiler.stage(CARDS, page):
+                cards = self.parse_cards(soup)
+            images = {card['image_lien'] for card in cards}
+
+            # Page vide ou sans annonce nouvelle (le site renvoie une page déjà vue
+            # au-delà de la dernière): la catégorie est épuisée
+            if not cards or images <= seen_images:
+                if show_progress:
+                    status_text.text(f"Page {page}: aucune nouvelle annonce, fin de la catégorie")
+                else:
+                    progress_callback(page, page, [])
+                break
+            seen_images |= images
+
+            discovered = self.find_last_page(soup)
+            if discovered is not None:
+                last_page = max(last_page or 0, discovered)
+                total_pages = min(num_pages, last_page) if num_pages else last_page
+
+            with self.profiler.stage(RECORDS, page):
+                page_data = self.build_records(cards, category)
+            with self.profiler.stage(QUALITY, page):
+                page_data = self.check_quality(page_data, category)
+
+            if page_data:
+                all_data.extend(page_data)
+
+            if show_progress:
+                status_text.text(f"Page {page}: {len(page_data)} annonces extraites")
+                progress_bar.progress(min(page / total_pages, 1.0))
+            else:
+                progress_callback(page, total_pages, page_data)
+
+            # Pas de lien vers une page suivante: c'était la dernière
+            if last_page is not None and page >= last_page:
+                break
+            if num_pages is not None and page >= num_pages:
+                break
+
+            self._pause(stop_event)
+            page += 1
+
+        if show_progress:
+            progress_bar.progress(1.0)
+            status_text.text(f"{self.label} terminé! {len(all_data)} annonces collectées.")
+        return all_data
+
+    def _pause(self, stop_event: Optional[threading.Event] = None) -> None:
+        """Pause de politesse entre deux pages, interrompue immédiatement en cas d'annulation"""
+        if stop_event is not None:
+            stop_event.wait(1)
+        else:
+            time.sleep(1)
+
+    def save_to_csv(self, data: List[Dict], filename: str, mode: Optional[str] = None) -> str:
+        """Sauvegarde les données en CSV (voir save_dataset)"""
+        return save_dataset(data, filename, mode or self.mode, profiler=self.profiler)
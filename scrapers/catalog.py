@@ -0,0 +1,197 @@
+import sqlite3
+import json
+import csv
+import os
+from typing import List, Dict, Optional
+
+DATA_DIRS = {
+    'cleaned': 'data/cleaned',
+    'raw': 'data/raw'
+}
+
+CATALOG_PATH = 'data/catalog.db'
+
+EVALUATIONS_DIR = 'data/evaluations'
+
+_data_dirs_ready = False
+
+
+def ensure_data_dirs() -> None:
+    """Crée les dossiers de données une seule fois par processus
+
+    Le module reste chargé entre deux reruns Streamlit: les appels suivants
+    ne touchent plus au disque.
+    """
+    global _data_dirs_ready
+    if _data_dirs_ready:
+        return
+    for folder in (*DATA_DIRS.values(), EVALUATIONS_DIR):
+        os.makedirs(folder, exist_ok=True)
+    _data_dirs_ready = True
+
+
+class DataCatalog:
+    """Catalogue indexé des fichiers de données (mis à jour à chaque sauvegarde)"""
+
+    def __init__(self, db_path: str = CATALOG_PATH):
+        self.db_path = db_path
+        # Date de modification de chaque dossier de données au dernier prune()
+        self._dir_mtimes: Dict[str, Optional[int]] = {}
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    filename TEXT NOT NULL,
+                    category TEXT,
+                    mode TEXT NOT NULL,
+                    rows INTEGER,
+                    size INTEGER,
+                    created REAL,
+                    schema TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_files_mode_created ON files (mode, created)")
+
+        # Premier lancement: indexer les fichiers déjà présents sur disque
+        if self.is_empty():
+            self.rebuild()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def is_empty(self) -> bool:
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM files LIMIT 1").fetchone() is None
+
+    def register(self, filepath: str, mode: str, category: str = "",
+                 rows: Optional[int] = None, columns: Optional[List[str]] = None) -> None:
+        """Ajoute ou met à jour un fichier dans le catalogue"""
+        stat = os.stat(filepath)
+        filename = os.path.basename(filepath)
+
+        if not category:
+            category = filename.split('_')[0]
+
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO files (path, filename, category, mode, rows, size, created, schema)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    filepath, filename, category, mode, rows, stat.st_size,
+                    stat.st_ctime, json.dumps(columns or [], ensure_ascii=False)
+                )
+            )
+
+    def register_dataframe(self, filepath: str, df, mode: str, category: str = "") -> None:
+        """Enregistre un fichier CSV qui vient d'être écrit depuis un DataFrame"""
+        self.register(filepath, mode, category, rows=len(df), columns=list(df.columns))
+
+    def remove(self, filepath: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM files WHERE path = ?", (filepath,))
+
+    def prune(self) -> int:
+        """Retire les fichiers supprimés hors de l'application; retourne leur nombre
+
+        Une suppression change la date du dossier: les fichiers d'un mode ne
+        sont vérifiés que si son dossier a changé depuis le dernier appel.
+        """
+        changed = []
+        for mode, folder in DATA_DIRS.items():
+            try:
+                mtime = os.stat(folder).st_mtime_ns
+            except OSError:
+                mtime = None
+            if self._dir_mtimes.get(mode, -1) != mtime:
+                self._dir_mtimes[mode] = mtime
+                changed.append(mode)
+        if not changed:
+            return 0
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT path FROM files WHERE mode IN ({','.join('?' * len(changed))})", changed
+            ).fetchall()
+            missing = [(row['path'],) for row in rows if not os.path.exists(row['path'])]
+            conn.executemany("DELETE FROM files WHERE path = ?", missing)
+        return len(missing)
+
+    def list_files(self, mode: str) -> List[Dict]:
+        """Fichiers d'un mode ('cleaned' ou 'raw'), du plus récent au plus ancien"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM files WHERE mode = ? ORDER BY created DESC", (mode,)
+            ).fetchall()
+
+        entries = []
+        for row in rows:
+            entry = dict(row)
+            entry['schema'] = json.loads(entry['schema'] or '[]')
+            entries.append(entry)
+        return entries
+
+    def count_files(self) -> Dict[str, int]:
+        """Nombre de fichiers par mode"""
+        counts = {mode: 0 for mode in DATA_DIRS}
+        with self._connect() as conn:
+            for row in conn.execute("SELECT mode, COUNT(*) AS n FROM files GROUP BY mode"):
+                counts[row['mode']] = row['n']
+        return counts
+
+    def latest_created(self) -> Optional[float]:
+        """Date de création du fichier le plus récent (timestamp)"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT MAX(created) AS latest FROM files").fetchone()
+        return row['latest'] if row else None
+
+    def rebuild(self) -> int:
+        """Reconstruit le catalogue à partir des dossiers de données"""
+        entries = []
+        for mode, folder in DATA_DIRS.items():
+            if not os.path.exists(folder):
+                continue
+            with os.scandir(folder) as it:
+                for entry in it:
+                    if not entry.name.endswith('.csv'):
+                        continue
+                    stat = entry.stat()
+                    entries.append((
+                        f"{folder}/{entry.name}", entry.name, entry.name.split('_')[0], mode,
+                        count_csv_rows(entry.path), stat.st_size, stat.st_ctime,
+                        json.dumps(read_csv_header(entry.path))
+                    ))
+
+        with self._connect() as conn:
+            conn.execute("DELETE FROM files")
+            conn.executemany(
+                """
+                INSERT INTO files (path, filename, category, mode, rows, size, created, schema)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                entries
+            )
+        return len(entries)
+
+
+def read_csv_header(filepath: str) -> List[str]:
+    """Lit uniquement l'en-tête d'un CSV (sans charger le fichier)"""
+    try:
+        with open(filepath, newline='', encoding='utf-8') as f:
+            return next(csv.reader(f), [])
+    except (OSError, UnicodeDecodeError):
+        return []
+
+
+def count_csv_rows(filepath: str) -> Optional[int]:
+    """Nombre de lignes de données d'un CSV (champs multilignes compris)"""
+    try:
+        with open(filepath, newline='', encoding='utf-8') as f:
+            return max(sum(1 for _ in csv.reader(f)) - 1, 0)
+    except (OSError, UnicodeDecodeError, csv.Error):
+        return None
@@ -0,0 +1,237 @@
+import math
+import os
+import re
+import sqlite3
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np
+
+from scrapers.base import listing_key, normalize_text
+
+INDEX_PATH = 'data/dedup_index.db'
+
+# Nombre premier de Mersenne 2^31 - 1: a * x + b tient dans un uint64
+_PRIME = np.uint64((1 << 31) - 1)
+
+
+def price_value(price_text: str) -> float:
+    """Prix numérique (NaN si absent)"""
+    digits = re.sub(r'\D', '', str(price_text or ''))
+    return float(digits) if digits else math.nan
+
+
+def listing_text(record: Dict) -> str:
+    """Texte comparé pour une annonce: description, titre et adresse"""
+    parts = [record.get(field, '') for field in ('description', 'titre', 'adresse')]
+    return normalize_text(' '.join(str(part) for part in parts if part))
+
+
+def shingles(text: str) -> np.ndarray:
+    """4-grammes d'octets du texte, chacun codé exactement sur 32 bits
+
+    Les doublons ne sont pas retirés: ils ne changent pas le minimum MinHash.
+    """
+    data = np.frombuffer(text.encode('utf-8'), dtype=np.uint8).astype(np.uint64)
+    if len(data) < 4:
+        data = np.pad(data, (0, 4 - len(data)))
+    return (data[:-3] << np.uint64(24)) | (data[1:-2] << np.uint64(16)) | (data[2:-1] << np.uint64(8)) | data[3:]
+
+
+class NearDuplicateIndex:
+    """Index MinHash/LSH incrémental des annonces quasi identiques, stocké dans SQLite
+
+    Chaque annonce reçoit une signature MinHash de num_perm valeurs, découpée
+    en bands bandes. Un groupe (cluster) est représenté par la signature de
+    sa première annonce et par la fourchette de prix de ses annonces; seuls
+    les représentants sont rangés dans les seaux LSH. Une nouvelle annonce
+    rejoint le groupe le plus semblable dont la similarité avec le
+    représentant atteint threshold et dont la fourchette de prix, en
+    l'incluant, reste dans price_tolerance; sinon elle fonde son groupe.
+
+    Les groupes ne fusionnent jamais: pas de chaînes d'annonces de proche en
+    proche, et le cluster_id (clé de la première annonce) ne change plus. Des
+    annonces au texte identique ne créent qu'autant de groupes que de
+    fourchettes de prix, et un seau garde au plus max_bucket représentants:
+    le coût d'un ajout reste borné quel que soit le nombre d'annonces.
+
+    Chaque lot (assign) est traité dans une transaction: plusieurs processus
+    (application, planificateur, export de la file) partagent le même fichier
+    sans écraser leurs ajouts.
+    """
+
+    def __init__(self, db_path: str = INDEX_PATH, num_perm: int = 64, bands: int = 16,
+                 threshold: float = 0.7, price_tolerance: float = 0.15, max_bucket: int = 100,
+                 seed: int = 42):
+        if num_perm % bands:
+            raise ValueError("num_perm doit être un multiple de bands")
+        self.db_path = db_path
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.price_tolerance = price_tolerance
+        self.max_bucket = max_bucket
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_PRIME), size=num_perm, dtype=np.uint64)
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS listings (
+                    key TEXT PRIMARY KEY,
+                    cluster_id TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS clusters (
+                    cluster_id TEXT PRIMARY KEY,
+                    signature BLOB NOT NULL,
+                    price_min REAL,
+                    price_max REAL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS buckets (
+                    bucket BLOB NOT NULL,
+                    cluster_id TEXT NOT NULL,
+                    PRIMARY KEY (bucket, cluster_id)
+                ) WITHOUT ROWID
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: un lot = une transaction explicite (BEGIN IMMEDIATE)
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+
+    def signature(self, text: str) -> np.ndarray:
+        return self.signatures([text])[0]
+
+    def signatures(self, texts: List[str], chunk_size: int = 4096) -> np.ndarray:
+        """Signatures MinHash d'un lot de textes (calcul vectorisé par paquets)"""
+        result = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        for start in range(0, len(texts), chunk_size):
+            chunk = [shingles(text) for text in texts[start:start + chunk_size]]
+            offsets = np.cumsum([0] + [len(hashes) for hashes in chunk[:-1]])
+            hashes = np.concatenate(chunk) % _PRIME
+            permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % _PRIME
+            result[start:start + len(chunk)] = np.minimum.reduceat(permuted, offsets, axis=1).T
+        return result
+
+    def _buckets(self, signature: np.ndarray) -> List[bytes]:
+        """Clé de seau de chaque bande: numéro de bande suivi des valeurs de la bande"""
+        return [bytes([i]) + signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def _price_range(self, low: Optional[float], high: Optional[float], price: float) -> Tuple:
+        """Fourchette de prix du groupe en y ajoutant price; None si elle dépasse la tolérance"""
+        if math.isnan(price):
+            return low, high
+        if low is None:
+            return price, price
+        low, high = min(low, price), max(high, price)
+        # Même texte mais prix très différent: annonces distinctes (ex. plusieurs lots)
+        if (high - low) / max(high, 1) > self.price_tolerance:
+            return None
+        return low, high
+
+    def _add(self, conn: sqlite3.Connection, key: str, record: Dict, signature: np.ndarray) -> str:
+        price = price_value(record.get('prix', ''))
+        buckets = self._buckets(signature)
+        placeholders = ','.join('?' * len(buckets))
+
+        bucket_sizes = dict(conn.execute(
+            f"SELECT bucket, COUNT(*) FROM buckets WHERE bucket IN ({placeholders}) GROUP BY bucket", buckets
+        ).fetchall())
+        candidates = conn.execute(
+            f"""
+            SELECT cluster_id, signature, price_min, price_max FROM clusters WHERE cluster_id IN (
+                SELECT cluster_id FROM buckets WHERE bucket IN ({placeholders})
+            ) ORDER BY rowid
+            """,
+            buckets
+        ).fetchall()
+
+        best, best_similarity, best_range = None, 0.0, None
+        if candidates:
+            signatures = np.frombuffer(b''.join(row[1] for row in candidates), dtype=np.uint32)
+            similarity = (signatures.reshape(len(candidates), self.num_perm) == signature).mean(axis=1)
+            # Le plus semblable; à égalité, le plus ancien
+            for (cluster_id, _, low, high), score in zip(candidates, similarity):
+                if score < self.threshold or score <= best_similarity:
+                    continue
+                price_range = self._price_range(low, high, price)
+                if price_range is not None:
+                    best, best_similarity, best_range = cluster_id, score, price_range
+
+        if best is not None:
+            conn.execute("UPDATE clusters SET price_min = ?, price_max = ? WHERE cluster_id = ?",
+                         (*best_range, best))
+        else:
+            best = key
+            low, high = self._price_range(None, None, price)
+            conn.execute("INSERT INTO clusters (cluster_id, signature, price_min, price_max) VALUES (?, ?, ?, ?)",
+                         (key, signature.astype(np.uint32).tobytes(), low, high))
+            # Seau plein (textes types très répétés): le groupe reste trouvable par ses autres bandes
+            conn.executemany(
+                "INSERT OR IGNORE INTO buckets (bucket, cluster_id) VALUES (?, ?)",
+                [(bucket, key) for bucket in buckets if bucket_sizes.get(bucket, 0) < self.max_bucket]
+            )
+        conn.execute("INSERT INTO listings (key, cluster_id) VALUES (?, ?)", (key, best))
+        return best
+
+    def cluster_of(self, key: str) -> Optional[str]:
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT cluster_id FROM listings WHERE key = ?", (key,)).fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else None
+
+    def assign(self, records: List[Dict]) -> List[str]:
+        """cluster_id de chaque annonce (ajoutées à l'index au passage)"""
+        keys = [listing_key(record) for record in records]
+        texts = [listing_text(record) for record in records]
+
+        conn = self._connect()
+        try:
+            known = {}
+            unique_keys = list(dict.fromkeys(keys))
+            for start in range(0, len(unique_keys), 500):
+                chunk = unique_keys[start:start + 500]
+                known.update(conn.execute(
+                    f"SELECT key, cluster_id FROM listings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall())
+
+            todo = [i for i, key in enumerate(keys) if key not in known and texts[i]]
+            signatures = dict(zip(todo, self.signatures([texts[i] for i in todo]))) if todo else {}
+
+            conn.execute("BEGIN IMMEDIATE")
+            cluster_ids = []
+            for i, key in enumerate(keys):
+                if key not in known:
+                    # Rien à comparer: l'annonce forme son propre groupe
+                    known[key] = self._add(conn, key, records[i], signatures[i]) if texts[i] else key
+                cluster_ids.append(known[key])
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return cluster_ids
+
+    def __len__(self) -> int:
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM listings").fetchone()[0]
+        finally:
+            conn.close()
+
+
+def add_cluster_ids(df):
+    """Ajoute la colonne cluster_id à un DataFrame d'annonces nettoyées (index mis à jour au passage)"""
+    df = df.copy()
+    df['cluster_id'] = NearDuplicateIndex().assign(df.fillna('').to_dict('records'))
+    return df
@@ -0,0 +1,199 @@
+from collections import defaultdict
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
+
+from scrapers.base import normalize_text
+
+# Quartiers par ville (Dakar et principales villes du Sénégal présentes sur CoinAfrique)
+GAZETTEER = {
+    'Dakar': [
+        'Almadies', 'Ngor', 'Ouakam', 'Yoff', 'Mermoz', 'Sacré-Coeur', 'Point E', 'Fann',
+        'Fann Résidence', 'Plateau', 'Médina', 'Gueule Tapée', 'Fass', 'Colobane', 'HLM',
+        'Grand Dakar', 'Sicap Liberté', 'Sicap Baobab', 'Sicap Amitié', 'Sicap Karack',
+        'Dieuppeul', 'Derklé', 'Grand Yoff', 'Parcelles Assainies', "Patte d'Oie", 'Cambérène',
+        'Ouest Foire', 'Nord Foire', 'Liberté 6', 'Mamelles', 'Virage', 'Hann', 'Hann Maristes',
+        'Bel Air', 'Zone B', 'Castors', 'Dalifort', 'Golf Sud', 'Biscuiterie', 'Hlm Grand Yoff',
+        'Cité Keur Gorgui', 'Cité Djily Mbaye', 'Cité Mixta', 'Sotrac Mermoz', 'VDN',
+        'Pointe des Almadies', 'Corniche Ouest', 'Amitié', 'Baobab', 'Liberté', 'Scat Urbam',
+        'Cité Biagui', 'Ngor Virage', 'Mermoz Pyrotechnie', 'Yoff Tonghor', 'Ouakam Cité Avion',
+        'Zone de Captage'
+    ],
+    'Pikine': ['Thiaroye', 'Guinaw Rail', 'Dalifort Foirail', 'Pikine Icotaf', 'Mbao', 'Tivaouane Diacksao'],
+    'Guédiawaye': ['Golf', 'Sam Notaire', 'Wakhinane', 'Ndiarème Limamoulaye', 'Hamo'],
+    'Keur Massar': ['Jaxaay', 'Malika', 'Yeumbeul', 'Boune'],
+    'Rufisque': ['Bargny', 'Sangalkam', 'Bambilor', 'Tivaouane Peulh', 'Niaga', 'Lac Rose',
+                 'Sébikotane', 'Yenne', 'Toubab Dialaw', 'Cité Gendarmerie'],
+    'Diamniadio': ['Pôle Urbain', 'Lac Rose Diamniadio'],
+    'Thiès': ['Keur Issa', 'Nguinth', 'Cité Lamy', 'Mbour 4'],
+    'Mbour': ['Saly', 'Saly Portudal', 'Ngaparou', 'Somone', 'Popenguine', 'Nguekhokh',
+              'Warang', 'Nianing', 'Mbodiene', 'Pointe Sarène'],
+    'Saint-Louis': ['Sor', 'Ndar Toute', 'Guet Ndar', 'Hydrobase'],
+    'Touba': ['Darou Marnane', 'Darou Khoudoss'],
+    'Kaolack': [],
+    'Ziguinchor': ['Cap Skirring'],
+    'Louga': [],
+    'Tivaouane': [],
+    'Fatick': [],
+    'Joal': []
+}
+
+# Graphies courantes renvoyant à un quartier (noms de communes composés, abréviations)
+ALIASES = {
+    'ngor almadies': 'Almadies',
+    'mermoz sacre coeur': 'Sacré-Coeur',
+    'sacre coeur 3': 'Sacré-Coeur',
+    'sacre coeur 2': 'Sacré-Coeur',
+    'sacre coeur 1': 'Sacré-Coeur',
+    'parcelles': 'Parcelles Assainies',
+    'patte d oie': "Patte d'Oie",
+    'liberte 6 extension': 'Liberté 6',
+    'point e': 'Point E',
+    'pointe e': 'Point E',
+    'cite keur gorgui': 'Cité Keur Gorgui',
+    'keur gorgui': 'Cité Keur Gorgui',
+    'saly portudal': 'Saly',
+    'diamnadio': 'Pôle Urbain',
+    'pole urbain de diamniadio': 'Pôle Urbain'
+}
+
+# Lieux dont le nom est aussi un mot courant des annonces (« vue sur golf », « au virage »):
+# reconnus dans une adresse, jamais dans un titre ou une description
+COMMON_WORD_PLACES = ['Golf', 'Virage', 'Castors', 'Baobab', 'Liberté', 'Amitié', 'Plateau', 'Corniche Ouest']
+
+NOT_FOUND = (None, None)
+
+
+class Gazetteer:
+    """Index des lieux pour normaliser les adresses en (quartier, ville)
+
+    Deux niveaux de recherche:
+    - correspondance exacte par trie de mots (plus longue séquence, quartier
+      prioritaire sur ville), en O(nombre de mots de l'adresse);
+    - à défaut de quartier, correspondance approchée par trigrammes de
+      caractères (coefficient de Dice) via un index inversé, pour les fautes
+      de frappe; elle doit rester cohérente avec la ville trouvée exactement.
+      Le nombre de mots doit être le même, et les noms comportant une lettre
+      isolée (Zone B, Point E) en sont exclus: une seule lettre ne se corrige pas.
+    Sur du texte libre (free_text=True), seule la correspondance exacte est
+    utilisée, sans les lieux de common_words.
+    Les résultats sont mis en cache (LRU) par adresse normalisée.
+    """
+
+    def __init__(self, gazetteer: Dict[str, List[str]] = GAZETTEER, aliases: Dict[str, str] = ALIASES,
+                 common_words: List[str] = COMMON_WORD_PLACES, min_similarity: float = 0.7,
+                 cache_size: int = 100_000):
+        self.min_similarity = min_similarity
+        self.common_words = {normalize_text(name) for name in common_words}
+        # nom normalisé -> (quartier, ville)
+        self.places: Dict[str, Tuple[Optional[str], str]] = {}
+
+        for ville, quartiers in gazetteer.items():
+            self.places.setdefault(normalize_text(ville), (None, ville))
+            for quartier in quartiers:
+                self.places[normalize_text(quartier)] = (quartier, ville)
+
+        quartier_villes = {q: v for v, qs in gazetteer.items() for q in qs}
+        for alias, quartier in aliases.items():
+            self.places[normalize_text(alias)] = (quartier, quartier_villes[quartier])
+
+        # Trie de mots: chaque nœud est un dict {mot: nœud}, la clé None porte le lieu
+        self.trie: Dict = {}
+        for name, place in self.places.items():
+            node = self.trie
+            for token in name.split():
+                node = node.setdefault(token, {})
+            node[None] = place
+
+        # Index inversé trigramme -> noms
+        self.names = [name for name in self.places if min(len(token) for token in name.split()) > 1]
+        self.name_trigrams = [self._trigrams(name) for name in self.names]
+        self.name_sizes = [len(name.split()) for name in self.names]
+        self.trigram_index = defaultdict(list)
+        for position, trigrams in enumerate(self.name_trigrams):
+            for trigram in trigrams:
+                self.trigram_index[trigram].append(position)
+        self.max_name_tokens = max(len(name.split()) for name in self.names)
+
+        self.resolve_normalized = lru_cache(maxsize=cache_size)(self._resolve_normalized)
+
+    @staticmethod
+    def _trigrams(text: str) -> frozenset:
+        padded = f"  {text} "
+        return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+    def _exact(self, tokens: List[str], free_text: bool = False) -> Optional[Tuple[Optional[str], str]]:
+        best = None
+        best_rank = (0, 0)
+        for start in range(len(tokens)):
+            node = self.trie
+            for end in range(start, len(tokens)):
+                node = node.get(tokens[end])
+                if node is None:
+                    break
+                place = node.get(None)
+                if free_text and place is not None and ' '.join(tokens[start:end + 1]) in self.common_words:
+                    continue
+                if place is not None:
+                    # Quartier avant ville, puis la séquence la plus longue, puis la plus à gauche
+                    rank = (place[0] is not None, end - start + 1)
+                    if rank > best_rank:
+                        best, best_rank = place, rank
+        return best
+
+    def _fuzzy(self, tokens: List[str]) -> Optional[Tuple[Optional[str], str]]:
+        best, best_rank = None, (False, self.min_similarity)
+        for size in range(1, min(self.max_name_tokens, len(tokens)) + 1):
+            for start in range(len(tokens) - size + 1):
+                window = ' '.join(tokens[start:start + size])
+                if len(window) < 4:
+                    continue
+                trigrams = self._trigrams(window)
+                shared = defaultdict(int)
+                for trigram in trigrams:
+                    for position in self.trigram_index.get(trigram, ()):
+                        shared[position] += 1
+                for position, count in shared.items():
+                    # Une faute de frappe ne supprime pas un mot: « grand » n'est pas « grand yoff »
+                    if self.name_sizes[position] != size:
+                        continue
+                    score = 2 * count / (len(trigrams) + len(self.name_trigrams[position]))
+                    if score < self.min_similarity:
+                        continue
+                    place = self.places[self.names[position]]
+                    # Quartier avant ville, puis la meilleure similarité
+                    rank = (place[0] is not None, score)
+                    if rank > best_rank:
+                        best, best_rank = place, rank
+        return best
+
+    def _resolve_normalized(self, normalized: str, free_text: bool = False) -> Tuple[Optional[str], Optional[str]]:
+        tokens = normalized.split()
+        if not tokens:
+            return NOT_FOUND
+        exact = self._exact(tokens, free_text)
+        if free_text or (exact is not None and exact[0] is not None):
+            return exact or NOT_FOUND
+
+        fuzzy = self._fuzzy(tokens)
+        if fuzzy is not None and (exact is None or fuzzy[1] == exact[1]):
+            return fuzzy
+        return exact or NOT_FOUND
+
+    def resolve(self, address: str, free_text: bool = False) -> Tuple[Optional[str], Optional[str]]:
+        """(quartier, ville) d'une adresse libre; (None, None) si aucun lieu reconnu
+
+        free_text=True pour un titre ou une description: correspondance exacte
+        uniquement, hors noms qui sont aussi des mots courants.
+        """
+        return self.resolve_normalized(normalize_text(address), free_text)
+
+
+_shared_gazetteer: Optional[Gazetteer] = None
+
+
+def get_gazetteer() -> Gazetteer:
+    """Gazetteer partagé (index construit une seule fois par processus)"""
+    global _shared_gazetteer
+    if _shared_gazetteer is None:
+        _shared_gazetteer = Gazetteer()
+    return _shared_gazetteer
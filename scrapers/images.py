@@ -0,0 +1,206 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Callable
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scrapers.transport import build_headers
+
+IMAGES_DIR = 'data/images'
+
+# Statuts par image
+DOWNLOADED = "téléchargée"
+DUPLICATE = "doublon"
+NOT_MODIFIED = "non modifiée"
+SKIPPED = "déjà connue"
+FAILED = "erreur"
+
+
+class RateLimiter:
+    """Seau à jetons partagé entre threads (requêtes par seconde)"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, stop_event: Optional[threading.Event] = None) -> bool:
+        """Attend un jeton; retourne False si stop_event est levé entre-temps"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+
+            if stop_event is not None:
+                if stop_event.wait(wait):
+                    return False
+            else:
+                time.sleep(wait)
+
+
+# Budget commun à tous les téléchargements d'images du processus, séparé de
+# celui du crawl des pages d'annonces
+_image_rate_limiter = RateLimiter(rate=2.0, burst=2)
+
+# Index partagé par tous les téléchargeurs du processus (un par fichier index.json):
+# deux tâches d'images simultanées enrichissent le même dictionnaire au lieu
+# d'écraser mutuellement leurs entrées à l'enregistrement
+_indexes: Dict[str, Dict[str, Dict]] = {}
+_index_lock = threading.Lock()
+
+
+def _read_index(index_path: str) -> Dict[str, Dict]:
+    if not os.path.exists(index_path):
+        return {}
+    with open(index_path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _shared_index(index_path: str) -> Dict[str, Dict]:
+    key = os.path.abspath(index_path)
+    with _index_lock:
+        if key not in _indexes:
+            _indexes[key] = _read_index(index_path)
+        return _indexes[key]
+
+
+class ThumbnailDownloader:
+    """Téléchargement concurrent et borné des miniatures, stockées par contenu
+
+    Chaque image est écrite dans store_dir/<sha256[:2]>/<sha256><ext>: deux URL
+    au contenu identique ne sont stockées qu'une fois. L'index (store_dir/index.json)
+    garde pour chaque URL son empreinte, son ETag et son Last-Modified afin de
+    revalider les images connues par requête conditionnelle (304). Il est
+    partagé par les téléchargeurs du processus et fusionné avec le fichier
+    à l'enregistrement (entrées ajoutées par un autre processus conservées).
+    """
+
+    def __init__(self, store_dir: str = IMAGES_DIR, max_workers: int = 2,
+                 rate_limiter: Optional[RateLimiter] = None, timeout: float = 20,
+                 revalidate: bool = True):
+        self.store_dir = store_dir
+        self.max_workers = max_workers
+        self.rate_limiter = rate_limiter or _image_rate_limiter
+        self.timeout = timeout
+        self.revalidate = revalidate
+        self.index_path = os.path.join(store_dir, 'index.json')
+
+        self.session = requests.Session()
+        self.session.headers.update(build_headers({'Accept': 'image/avif,image/webp,image/*,*/*;q=0.8'}))
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._lock = _index_lock
+        self.index = _shared_index(self.index_path)
+
+    def save_index(self) -> None:
+        os.makedirs(self.store_dir, exist_ok=True)
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with self._lock:
+            for url, entry in _read_index(self.index_path).items():
+                self.index.setdefault(url, entry)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.index, f, ensure_ascii=False)
+            os.replace(tmp_path, self.index_path)
+
+    def path_for(self, digest: str, url: str) -> str:
+        ext = os.path.splitext(urlparse(url).path)[1].lower() or '.jpg'
+        return os.path.join(self.store_dir, digest[:2], f"{digest}{ext}")
+
+    def fetch(self, url: str, stop_event: Optional[threading.Event] = None) -> Dict:
+        """Télécharge une image et retourne {'url', 'status', 'bytes', 'path'}"""
+        with self._lock:
+            known = self.index.get(url)
+
+        if known and not self.revalidate:
+            return {'url': url, 'status': SKIPPED, 'bytes': 0, 'path': known['path']}
+
+        headers = {}
+        if known and os.path.exists(known['path']):
+            if known.get('etag'):
+                headers['If-None-Match'] = known['etag']
+            if known.get('last_modified'):
+                headers['If-Modified-Since'] = known['last_modified']
+
+        if not self.rate_limiter.acquire(stop_event):
+            return {'url': url, 'status': SKIPPED, 'bytes': 0, 'path': ""}
+
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            if response.status_code == 304:
+                return {'url': url, 'status': NOT_MODIFIED, 'bytes': 0, 'path': known['path']}
+            response.raise_for_status()
+        except Exception as e:
+            return {'url': url, 'status': FAILED, 'bytes': 0, 'path': "", 'error': str(e)}
+
+        content = response.content
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.path_for(digest, url)
+
+        status = DUPLICATE
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+            status = DOWNLOADED
+
+        with self._lock:
+            self.index[url] = {
+                'sha256': digest,
+                'path': path,
+                'etag': response.headers.get('ETag', ''),
+                'last_modified': response.headers.get('Last-Modified', '')
+            }
+        return {'url': url, 'status': status, 'bytes': len(content), 'path': path}
+
+    def download_all(self, urls: List[str],
+                     progress_callback: Optional[Callable[[int, int], None]] = None,
+                     stop_event: Optional[threading.Event] = None) -> Dict:
+        """Télécharge une liste d'URL (dédoublonnée) et retourne un rapport de débit"""
+        unique_urls = [url for url in dict.fromkeys(urls) if url]
+        counts = {status: 0 for status in (DOWNLOADED, DUPLICATE, NOT_MODIFIED, SKIPPED, FAILED)}
+        total_bytes = 0
+        errors = []
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="thumbnails") as executor:
+            futures = [executor.submit(self.fetch, url, stop_event) for url in unique_urls]
+            for done, future in enumerate(futures, start=1):
+                result = future.result()
+                counts[result['status']] += 1
+                total_bytes += result['bytes']
+                if 'error' in result:
+                    errors.append(f"{result['url']}: {result['error']}")
+                if progress_callback:
+                    progress_callback(done, len(unique_urls))
+
+        self.save_index()
+        elapsed = time.perf_counter() - start
+        fetched = counts[DOWNLOADED] + counts[DUPLICATE] + counts[NOT_MODIFIED]
+
+        return {
+            'urls': len(urls),
+            'unique_urls': len(unique_urls),
+            'counts': counts,
+            'bytes': total_bytes,
+            'elapsed': elapsed,
+            'images_per_second': fetched / elapsed if elapsed else 0.0,
+            'kb_per_second': total_bytes / 1024 / elapsed if elapsed else 0.0,
+            'errors': errors
+        }
@@ -0,0 +1,198 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple
+
+from scrapers.scraper_clean import CoinAfriqueScraperCleaned
+from scrapers.web_scraper import CoinAfriqueScraperRaw
+from scrapers.pipeline import DualScraper, split_dual
+from scrapers.transport import get_transport
+from scrapers.images import ThumbnailDownloader
+from scrapers.profiling import ScrapeProfiler
+
+SCRAPER_CLASSES = {
+    'cleaned': CoinAfriqueScraperCleaned,
+    'raw': CoinAfriqueScraperRaw,
+    'both': DualScraper
+}
+
+# Statuts possibles d'une tâche
+PENDING = "en attente"
+RUNNING = "en cours"
+DONE = "terminé"
+CANCELLED = "annulé"
+FAILED = "erreur"
+
+
+class ScrapeJob:
+    """Tâche de scraping exécutée en arrière-plan"""
+
+    def __init__(self, mode: str, category: str, num_pages: Optional[int], owner: str = "",
+                 transport: Optional[str] = None, download_images: bool = False, profile: bool = False):
+        self.job_id = uuid.uuid4().hex[:8]
+        self.mode = mode
+        self.category = category
+        # num_pages=None: toutes les pages; total_pages est alors estimé au fil du scraping
+        self.num_pages = num_pages
+        self.total_pages = num_pages
+        # Session qui a lancé la tâche: seule autorisée à l'annuler
+        self.owner = owner
+        self.transport = transport
+        self.download_images = download_images
+        # Profilage cProfile/tracemalloc du scraping (profile_report une fois terminé)
+        self.profiler = ScrapeProfiler() if profile else None
+        self.profile_report: Optional[Dict] = None
+
+        self.status = PENDING
+        # Étape en cours: "annonces" puis "miniatures" si demandé
+        self.stage = "annonces"
+        self.images_done = 0
+        self.images_total = 0
+        self.image_report: Optional[Dict] = None
+        self.pages_done = 0
+        self.errors: List[str] = []
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+        self.cancel_event = threading.Event()
+        self._results: List[Dict] = []
+        # Données brutes des tâches 'both' (self._results contient alors les données nettoyées)
+        self._raw_results: List[Dict] = []
+        self._lock = threading.Lock()
+
+    @property
+    def progress(self) -> float:
+        if self.stage == "miniatures":
+            return self.images_done / self.images_total if self.images_total else 0.0
+        return min(self.pages_done / self.total_pages, 1.0) if self.total_pages else 0.0
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in (PENDING, RUNNING)
+
+    @property
+    def output_modes(self) -> Tuple[str, ...]:
+        """Jeux de données produits par la tâche"""
+        return ('cleaned', 'raw') if self.mode == 'both' else (self.mode,)
+
+    @property
+    def result_count(self) -> int:
+        with self._lock:
+            return len(self._results)
+
+    def results(self) -> List[Dict]:
+        """Copie des résultats collectés (partiels si la tâche est en cours)"""
+        with self._lock:
+            return list(self._results)
+
+    def raw_results(self) -> List[Dict]:
+        """Données brutes d'une tâche 'both'"""
+        with self._lock:
+            return list(self._raw_results)
+
+    def on_page(self, page: int, num_pages: int, page_data: List[Dict]) -> None:
+        if self.mode == 'both':
+            raw, page_data = split_dual(page_data)
+        with self._lock:
+            if self.mode == 'both':
+                self._raw_results.extend(raw)
+            self._results.extend(page_data)
+            self.pages_done = page
+            self.total_pages = num_pages
+
+    def on_image(self, done: int, total: int) -> None:
+        self.images_done = done
+        self.images_total = total
+
+
+class JobRunner:
+    """Registre de tâches de scraping partagé entre les sessions Streamlit"""
+
+    def __init__(self, max_workers: int = 2, max_history: int = 50):
+        self.max_history = max_history
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scrape-job")
+        self._jobs: Dict[str, ScrapeJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, mode: str, category: str, num_pages: Optional[int], owner: str = "",
+               transport: Optional[str] = None, download_images: bool = False, profile: bool = False) -> str:
+        """Met une tâche en file d'attente et retourne son identifiant"""
+        if mode not in SCRAPER_CLASSES:
+            raise ValueError(f"Mode '{mode}' non supporté")
+
+        job = ScrapeJob(mode, category, num_pages, owner, transport, download_images, profile)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._prune()
+
+        self._executor.submit(self._run, job)
+        return job.job_id
+
+    def get(self, job_id: Optional[str]) -> Optional[ScrapeJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self, mode: Optional[str] = None) -> List[ScrapeJob]:
+        """Tâches connues, de la plus récente à la plus ancienne"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        if mode:
+            jobs = [job for job in jobs if mode in job.output_modes]
+        return sorted(jobs, key=lambda job: job.created, reverse=True)
+
+    def cancel(self, job_id: str, owner: str = "") -> bool:
+        """Annule une tâche en cours; refusé si elle appartient à une autre session"""
+        job = self.get(job_id)
+        if not job or not job.is_active or (job.owner and job.owner != owner):
+            return False
+        job.cancel_event.set()
+        return True
+
+    def _run(self, job: ScrapeJob) -> None:
+        if job.cancel_event.is_set():
+            job.status = CANCELLED
+            job.finished = time.time()
+            return
+
+        job.status = RUNNING
+        job.started = time.time()
+        try:
+            scraper = SCRAPER_CLASSES[job.mode](
+                silent=True, transport=get_transport(job.transport), profiler=job.profiler
+            )
+            scraper.scrape_category(
+                job.category, job.num_pages,
+                progress_callback=job.on_page,
+                stop_event=job.cancel_event
+            )
+            job.errors = scraper.errors
+            if job.profiler:
+                job.profile_report = job.profiler.report()
+            
+            # Miniatures après le crawl, avec leur propre budget de requêtes
+            if job.download_images and not job.cancel_event.is_set():
+                job.stage = "miniatures"
+                urls = [listing.get('image_lien', '') for listing in job.results()]
+                job.image_report = ThumbnailDownloader().download_all(
+                    urls, progress_callback=job.on_image, stop_event=job.cancel_event
+                )
+                job.errors.extend(job.image_report['errors'][:10])
+            
+            job.status = CANCELLED if job.cancel_event.is_set() else DONE
+        except Exception as e:
+            job.errors.append(str(e))
+            job.status = FAILED
+        finally:
+            job.finished = time.time()
+
+    def _prune(self) -> None:
+        """Oublie les tâches terminées les plus anciennes au-delà de max_history"""
+        finished = sorted(
+            (job for job in self._jobs.values() if not job.is_active),
+            key=lambda job: job.created
+        )
+        excess = len(self._jobs) - self.max_history
+        for job in finished[:max(excess, 0)]:
+            del self._jobs[job.job_id]
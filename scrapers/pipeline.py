@@ -0,0 +1,51 @@
+from typing import List, Dict, Tuple
+from scrapers.base import CoinAfriqueScraperBase
+from scrapers.scraper_clean import CoinAfriqueScraperCleaned
+from scrapers.web_scraper import CoinAfriqueScraperRaw
+
+
+def split_dual(data: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+    """Sépare les paires {'raw', 'cleaned'} en deux listes (données brutes, nettoyées)"""
+    raw = [pair['raw'] for pair in data if pair['raw'] is not None]
+    cleaned = [pair['cleaned'] for pair in data if pair['cleaned'] is not None]
+    return raw, cleaned
+
+
+class DualScraper(CoinAfriqueScraperBase):
+    """Scraper produisant les données brutes ET nettoyées en un seul passage
+
+    Chaque page n'est téléchargée et analysée qu'une fois: les cartes issues de
+    parse_cards sont transmises aux deux constructeurs d'enregistrements. Les
+    annonces sont retournées par paires {'raw': ..., 'cleaned': ...}, à séparer
+    avec split_dual().
+    """
+
+    mode = 'cleaned'
+    label = "Scraping (brut + nettoyé)"
+
+    def __init__(self, base_url: str = "https://sn.coinafrique.com", silent: bool = False, transport=None,
+                 profiler=None):
+        super().__init__(base_url, silent, transport, profiler)
+        self.raw_builder = CoinAfriqueScraperRaw(base_url, silent, self.transport)
+        self.cleaned_builder = CoinAfriqueScraperCleaned(base_url, silent, self.transport)
+
+    def build_record(self, card: Dict, category: str) -> Dict:
+        pair = {}
+        for key, builder in (('raw', self.raw_builder), ('cleaned', self.cleaned_builder)):
+            try:
+                pair[key] = builder.build_record(card, category)
+            except Exception:
+                pair[key] = None
+        return pair
+
+    def check_quality(self, records: List[Dict], category: str) -> List[Dict]:
+        """Contrôle qualité des annonces nettoyées des paires (modifiées sur place)"""
+        self.cleaned_builder.check_quality([pair['cleaned'] for pair in records if pair['cleaned'] is not None], category)
+        return records
+
+    def save_both(self, data: List[Dict], category: str, timestamp: str) -> Tuple[str, str]:
+        """Sauvegarde les deux jeux de données; retourne (chemin brut, chemin nettoyé)"""
+        raw, cleaned = split_dual(data)
+        raw_path = self.save_to_csv(raw, f"{category}_raw_{timestamp}.csv", mode='raw')
+        cleaned_path = self.save_to_csv(cleaned, f"{category}_cleaned_{timestamp}.csv", mode='cleaned')
+        return raw_path, cleaned_path
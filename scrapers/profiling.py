@@ -0,0 +1,211 @@
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import List, Dict, Optional
+
+# Étapes mesurées lors d'un scraping
+FETCH = "téléchargement"
+PARSE = "analyse HTML"
+CARDS = "cartes"
+RECORDS = "enregistrements"
+QUALITY = "qualité"
+SAVE = "sauvegarde"
+
+_NULL_STAGE = nullcontext()
+
+# tracemalloc est global au processus: compteur des profilers en cours de mesure
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_started = False
+
+
+def _start_tracing() -> None:
+    global _tracing_users, _tracing_started
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_started = True
+        _tracing_users += 1
+
+
+def _stop_tracing() -> None:
+    global _tracing_users, _tracing_started
+    with _tracing_lock:
+        _tracing_users -= 1
+        # On n'arrête que le suivi démarré ici (pas celui d'un autre outil)
+        if _tracing_users == 0 and _tracing_started:
+            tracemalloc.stop()
+            _tracing_started = False
+
+
+def _location(filename: str, line: int) -> str:
+    if filename == '~':
+        return "intégré"
+    parts = filename.replace('\\', '/').split('/')
+    return f"{'/'.join(parts[-2:])}:{line}"
+
+
+class NullProfiler:
+    """Profiler désactivé: stage() ne mesure rien et ne coûte qu'un appel"""
+
+    enabled = False
+
+    def stage(self, name: str, page: Optional[int] = None):
+        return _NULL_STAGE
+
+    def report(self) -> Optional[Dict]:
+        return None
+
+    def save(self, dataset_path: str) -> Optional[str]:
+        return None
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class ScrapeProfiler:
+    """Profil d'un scraping par étape et par page (cProfile + tracemalloc)
+
+    Chaque étape (téléchargement, analyse HTML, cartes, enregistrements,
+    qualité, sauvegarde) est exécutée sous cProfile, avec tracemalloc actif pendant
+    l'étape seulement: le pic mesuré et les allocations relevées lui sont
+    propres. Pour l'étape au plus fort pic, on garde les lignes de code
+    dont les allocations sont encore vivantes en fin d'étape.
+
+    tracemalloc étant global, deux scrapings profilés en parallèle se
+    comptent mutuellement leurs allocations; cProfile peut aussi être
+    indisponible si un autre profiler est actif (l'étape n'est alors que
+    chronométrée).
+    """
+
+    enabled = True
+
+    def __init__(self, top: int = 15):
+        self.top = top
+        self.stage_stats: Dict[str, pstats.Stats] = {}
+        self.stages: Dict[str, Dict] = {}
+        self.pages: Dict[int, Dict] = {}
+        self.peak_bytes = 0
+        self.peak_stage: Optional[str] = None
+        self.peak_allocations: List[Dict] = []
+
+    @contextmanager
+    def stage(self, name: str, page: Optional[int] = None):
+        _start_tracing()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            profile = None
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            if profile is not None:
+                profile.disable()
+            peak = max(tracemalloc.get_traced_memory()[1] - baseline, 0)
+            if peak > self.peak_bytes:
+                self.peak_bytes = peak
+                self.peak_stage = name
+                self.peak_allocations = self._allocations()
+            _stop_tracing()
+            self._record(name, page, elapsed, peak, profile)
+
+    def _allocations(self) -> List[Dict]:
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap*>')
+        ])
+        return [
+            {
+                'location': _location(stat.traceback[0].filename, stat.traceback[0].lineno),
+                'size_kb': round(stat.size / 1024, 1),
+                'count': stat.count
+            }
+            for stat in snapshot.statistics('lineno')[:self.top]
+        ]
+
+    def _record(self, name: str, page: Optional[int], elapsed: float, peak: int,
+                profile: Optional[cProfile.Profile]) -> None:
+        stage = self.stages.setdefault(name, {'stage': name, 'calls': 0, 'seconds': 0.0, 'peak_kb': 0.0})
+        stage['calls'] += 1
+        stage['seconds'] += elapsed
+        stage['peak_kb'] = max(stage['peak_kb'], round(peak / 1024, 1))
+
+        if page is not None:
+            page_entry = self.pages.setdefault(page, {'page': page, 'peak_kb': 0.0})
+            page_entry[name] = page_entry.get(name, 0.0) + elapsed
+            page_entry['peak_kb'] = max(page_entry['peak_kb'], round(peak / 1024, 1))
+
+        if profile is not None:
+            if name in self.stage_stats:
+                self.stage_stats[name].add(profile)
+            else:
+                self.stage_stats[name] = pstats.Stats(profile)
+
+    def combined_stats(self) -> Optional[pstats.Stats]:
+        if not self.stage_stats:
+            return None
+        stats = pstats.Stats()
+        stats.add(*self.stage_stats.values())
+        return stats
+
+    def hotspots(self, stats: Optional[pstats.Stats] = None, top: Optional[int] = None) -> List[Dict]:
+        """Fonctions les plus coûteuses en temps propre (hors appels)"""
+        stats = stats or self.combined_stats()
+        if stats is None:
+            return []
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)
+        return [
+            {
+                'function': function,
+                'location': _location(filename, line),
+                'calls': calls,
+                'tottime': round(tottime, 4),
+                'cumtime': round(cumtime, 4)
+            }
+            for (filename, line, function), (_, calls, tottime, cumtime, _) in rows[:top or self.top]
+        ]
+
+    def report(self) -> Dict:
+        """Résumé sérialisable: étapes, pages, points chauds et pic d'allocations"""
+        for stage in self.stages.values():
+            stage['seconds'] = round(stage['seconds'], 4)
+        return {
+            'stages': list(self.stages.values()),
+            'pages': [
+                {key: round(value, 4) if isinstance(value, float) else value for key, value in self.pages[page].items()}
+                for page in sorted(self.pages)
+            ],
+            'hotspots': self.hotspots(),
+            'stage_hotspots': {name: self.hotspots(stats, 5) for name, stats in self.stage_stats.items()},
+            'peak_stage': self.peak_stage,
+            'peak_kb': round(self.peak_bytes / 1024, 1),
+            'peak_allocations': self.peak_allocations
+        }
+
+    def save(self, dataset_path: str) -> Optional[str]:
+        """Enregistre le profil à côté du fichier de données
+
+        <fichier>.prof (pstats, lisible avec python -m pstats ou snakeviz)
+        et <fichier>_profile.json (résumé). Retourne le chemin du résumé.
+        """
+        base = os.path.splitext(dataset_path)[0]
+        stats = self.combined_stats()
+        if stats is not None:
+            stats.dump_stats(f"{base}.prof")
+        report_path = f"{base}_profile.json"
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+        return report_path
@@ -0,0 +1,232 @@
+from typing import List, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from scrapers.rollups import AREA_PATTERN
+
+QUALITY_COLUMNS = ['quality_score', 'quality_flags', 'quarantined']
+
+# Numéro de téléphone sénégalais pris pour un prix (77 123 45 67, 221 78...)
+PHONE_PATTERN = r'^(?:221)?(?:7[05678]|3[03])\d{7}$'
+
+# En dessous, le « prix » est une surface, un nombre de pièces ou un montant en millions mal lu
+MIN_PRICE = 10_000
+# Au-delà, un loyer mensuel est en fait un prix de vente
+MAX_MONTHLY_RENT = 10_000_000
+
+# Score robuste |0.6745 (x - médiane) / MAD| au-delà duquel un prix est aberrant (Iglewicz & Hoaglin)
+OUTLIER_Z = 3.5
+# Taille minimale d'un groupe pour que sa médiane serve de référence
+MIN_GROUP_SIZE = 5
+# MAD minimale (en log): évite de déclarer aberrant tout écart dans un groupe de prix identiques
+MIN_MAD = 0.05
+
+# Pénalités retirées du score (1.0 = annonce complète et cohérente): un prix
+# inexploitable suffit à mettre l'annonce en quarantaine, un champ manquant non
+QUARANTINE_SCORE = 0.5
+PENALTIES = {
+    'telephone': 0.6,
+    'surface': 0.6,
+    'prix_improbable': 0.6,
+    'aberrant': 0.6,
+    'type_incoherent': 0.6,
+    'champ_manquant': 0.2
+}
+
+REQUIRED_FIELDS = {
+    'villas': ['prix', 'adresse', 'nombre_pieces'],
+    'appartements': ['prix', 'adresse', 'nombre_pieces'],
+    'terrains': ['prix', 'adresse', 'superficie']
+}
+DEFAULT_REQUIRED_FIELDS = ['prix', 'adresse']
+
+
+def _text(df: pd.DataFrame, column: str) -> pd.Series:
+    if column not in df.columns:
+        return pd.Series('', index=df.index, dtype=object)
+    return df[column].fillna('').astype(str).str.strip()
+
+
+def _per_unique(values: pd.Series, function) -> np.ndarray:
+    """Applique function aux valeurs distinctes seulement (prix et superficies se répètent beaucoup)"""
+    codes, uniques = pd.factorize(values)
+    return np.asarray(function(pd.Series(uniques, dtype=object)))[codes]
+
+
+def _parse_prices(prix: pd.Series) -> pd.DataFrame:
+    """Chiffres du prix, montant numérique et mention de devise pour chaque valeur distincte"""
+    digits = prix.str.replace(r'\D', '', regex=True)
+    return pd.DataFrame({
+        'digits': digits,
+        'price': pd.to_numeric(digits.where(digits != ''), errors='coerce').astype(float),
+        'has_currency': prix.str.contains('CFA', case=False)
+    })
+
+
+def _parse_areas(superficie: pd.Series) -> np.ndarray:
+    area = superficie.str.extract(AREA_PATTERN)[0]
+    return pd.to_numeric(area.str.replace(',', '.'), errors='coerce').astype(float).to_numpy()
+
+
+def _robust_center(frame: pd.DataFrame, keys: List[str]):
+    """Médiane, MAD et effectif de log_price par groupe, alignés sur les lignes"""
+    grouped = frame.groupby(keys, dropna=False, sort=False)['log_price']
+    median = grouped.transform('median')
+    deviation = (frame['log_price'] - median).abs()
+    mad = deviation.groupby([frame[key] for key in keys], dropna=False, sort=False).transform('median')
+    return median, mad, grouped.transform('count')
+
+
+def score_listings(df: pd.DataFrame, category=None, reference: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """Ajoute quality_score, quality_flags et quarantined à des annonces nettoyées
+
+    Tout est vectorisé (numpy/pandas). Les prix sont comparés en log à la
+    médiane de leur groupe (catégorie, type d'annonce, nombre de pièces), ou
+    de (catégorie, type d'annonce) si le groupe est trop petit; l'écart est
+    normalisé par la MAD. category est une valeur unique ou une colonne.
+    reference (colonnes category, type_annonce, pieces, log_price, voir
+    reference_frame) complète les statistiques calculées sur df.
+    """
+    df = df.copy()
+    if df.empty:
+        for column in QUALITY_COLUMNS:
+            df[column] = pd.Series(dtype=object)
+        return df
+
+    if category is None:
+        category = df['category'] if 'category' in df.columns else ''
+    categories = pd.Series(category, index=df.index).fillna('').astype(str)
+
+    codes, uniques = pd.factorize(_text(df, 'prix'))
+    parsed = _parse_prices(pd.Series(uniques, dtype=object))
+    phone = (~parsed['has_currency'] & parsed['digits'].str.match(PHONE_PATTERN)).to_numpy()[codes]
+    price = pd.Series(parsed['price'].to_numpy()[codes], index=df.index)
+    type_annonce = _text(df, 'type_annonce')
+    pieces = pd.Series(_per_unique(_text(df, 'nombre_pieces'), lambda values: pd.to_numeric(values, errors='coerce')),
+                       index=df.index, dtype=float)
+    area = _per_unique(_text(df, 'superficie'), _parse_areas)
+
+    flags = {
+        # Chiffres d'un numéro de téléphone sans mention de devise
+        'telephone': phone,
+        # Le motif de repli a capturé la superficie au lieu du prix
+        'surface': price.to_numpy() == area,
+        'prix_improbable': (price < MIN_PRICE).to_numpy()
+    }
+    valid = price.notna().to_numpy() & ~flags['telephone'] & ~flags['surface'] & ~flags['prix_improbable']
+
+    frame = pd.DataFrame({
+        'category': categories,
+        'type_annonce': type_annonce,
+        'pieces': pieces,
+        'log_price': np.log(price.where(valid))
+    })
+    batch_rows = len(frame)
+    if reference is not None and len(reference):
+        frame = pd.concat([frame, reference[frame.columns]], ignore_index=True)
+
+    fine_median, fine_mad, fine_count = _robust_center(frame, ['category', 'type_annonce', 'pieces'])
+    coarse_median, coarse_mad, coarse_count = _robust_center(frame, ['category', 'type_annonce'])
+    use_fine = (fine_count >= MIN_GROUP_SIZE).to_numpy()
+    median = np.where(use_fine, fine_median, coarse_median)[:batch_rows]
+    mad = np.fmax(np.where(use_fine, fine_mad, coarse_mad), MIN_MAD)[:batch_rows]
+    enough = ((coarse_count >= MIN_GROUP_SIZE).to_numpy() | use_fine)[:batch_rows]
+
+    log_price = frame['log_price'].to_numpy()[:batch_rows]
+    z = 0.6745 * (log_price - median) / mad
+    flags['aberrant'] = valid & enough & (np.abs(z) > OUTLIER_Z)
+
+    # Loyer ou vente mal classé: prix plus proche de la médiane de l'autre type
+    coarse = frame.assign(median=coarse_median, count=coarse_count)
+    coarse = coarse[coarse['count'] >= MIN_GROUP_SIZE].groupby(['category', 'type_annonce'])['median'].first()
+    rent_median = categories.map(coarse.xs('Location', level='type_annonce')
+                                 if 'Location' in coarse.index.get_level_values('type_annonce') else {})
+    sale_median = categories.map(coarse.xs('Vente', level='type_annonce')
+                                 if 'Vente' in coarse.index.get_level_values('type_annonce') else {})
+    rent_median, sale_median = rent_median.to_numpy(dtype=float), sale_median.to_numpy(dtype=float)
+    is_rent = (type_annonce == 'Location').to_numpy()
+    closer_to_sale = np.abs(log_price - sale_median) < np.abs(log_price - rent_median)
+    closer_to_rent = np.abs(log_price - rent_median) < np.abs(log_price - sale_median)
+    flags['type_incoherent'] = valid & (
+        (is_rent & (closer_to_sale | (price.to_numpy() > MAX_MONTHLY_RENT)))
+        | (~is_rent & closer_to_rent)
+    )
+
+    known = categories.isin(list(REQUIRED_FIELDS)).to_numpy()
+    missing = np.zeros(len(df), dtype=np.int64)
+    missing_any = np.zeros(len(df), dtype=bool)
+    for field in {field for fields in REQUIRED_FIELDS.values() for field in fields} | set(DEFAULT_REQUIRED_FIELDS):
+        with_field = [name for name, fields in REQUIRED_FIELDS.items() if field in fields]
+        required = np.where(known, categories.isin(with_field).to_numpy(), field in DEFAULT_REQUIRED_FIELDS)
+        if field not in df.columns:
+            empty = np.ones(len(df), dtype=bool)
+        else:
+            empty = (df[field].isna() | (df[field].astype(str).str.strip() == '')).to_numpy()
+        missing += required & empty
+        missing_any |= required & empty
+    flags['champ_manquant'] = missing_any
+
+    penalty = missing * PENALTIES['champ_manquant']
+    # Combinaison d'anomalies codée en bits, convertie en libellé par combinaison distincte
+    combination = np.zeros(len(df), dtype=np.int64)
+    for bit, (name, mask) in enumerate(flags.items()):
+        if name != 'champ_manquant':
+            penalty = penalty + mask * PENALTIES[name]
+        combination |= mask.astype(np.int64) << bit
+    names = list(flags)
+    codes, uniques = pd.factorize(combination)
+    labels = np.array([','.join(name for bit, name in enumerate(names) if value >> bit & 1) for value in uniques],
+                      dtype=object)
+
+    df['quality_score'] = np.clip(1.0 - penalty, 0.0, 1.0).round(2)
+    df['quality_flags'] = labels[codes]
+    df['quarantined'] = df['quality_score'] < QUARANTINE_SCORE
+    return df
+
+
+def reference_frame(df: pd.DataFrame, category) -> pd.DataFrame:
+    """Prix valides d'annonces déjà contrôlées, au format attendu par score_listings(reference=...)"""
+    scored = df if 'quality_flags' in df.columns else score_listings(df, category)
+    flags = scored['quality_flags'].fillna('')
+    keep = ~flags.str.contains('telephone|surface|prix_improbable', regex=True)
+    price = pd.Series(_per_unique(_text(scored, 'prix'), lambda values: _parse_prices(values)['price']),
+                      index=scored.index, dtype=float)
+    frame = pd.DataFrame({
+        'category': pd.Series(category, index=scored.index).fillna('').astype(str),
+        'type_annonce': _text(scored, 'type_annonce'),
+        'pieces': pd.Series(_per_unique(_text(scored, 'nombre_pieces'),
+                                        lambda values: pd.to_numeric(values, errors='coerce')),
+                            index=scored.index, dtype=float),
+        'log_price': np.log(price.where(keep & (price > 0)))
+    })
+    return frame[frame['log_price'].notna()]
+
+
+class QualityStage:
+    """Contrôle qualité page par page pendant un scraping
+
+    Chaque lot est noté avec les statistiques des lots précédents du même
+    scraping (reference): les premières pages, peu nombreuses, sont surtout
+    contrôlées sur les champs manquants et les prix improbables. La note
+    définitive est recalculée sur le jeu complet à la sauvegarde.
+    """
+
+    def __init__(self):
+        self.reference: Optional[pd.DataFrame] = None
+
+    def score_records(self, records: List[Dict], category: str) -> List[Dict]:
+        """Ajoute les colonnes de qualité aux enregistrements (modifiés sur place)"""
+        if not records:
+            return records
+        scored = score_listings(pd.DataFrame(records), category, self.reference)
+        for record, score, flags, quarantined in zip(
+            records, scored['quality_score'], scored['quality_flags'], scored['quarantined']
+        ):
+            record['quality_score'] = float(score)
+            record['quality_flags'] = flags
+            record['quarantined'] = bool(quarantined)
+
+        batch = reference_frame(scored, category)
+        self.reference = batch if self.reference is None else pd.concat([self.reference, batch], ignore_index=True)
+        return records
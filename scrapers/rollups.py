@@ -0,0 +1,368 @@
+import sqlite3
+import json
+import math
+import os
+import re
+from collections import defaultdict
+from datetime import datetime, date, timedelta
+from typing import List, Dict, Optional, Tuple
+
+from scrapers.base import listing_key
+from scrapers.dedup import price_value
+
+ROLLUPS_PATH = 'data/rollups.db'
+
+DAY = 'day'
+WEEK = 'week'
+PERIODS = (DAY, WEEK)
+
+# Valeur de quartier des agrégats toutes localisations confondues
+ALL_QUARTIERS = '*'
+
+# Annonce considérée retirée si elle n'a plus été vue depuis ce nombre de jours
+REMOVAL_DAYS = 7
+
+AREA_PATTERN = re.compile(r'(\d+(?:[.,]\d+)?)\s*(m²|m2|ha|hectares?)', re.IGNORECASE)
+
+
+def area_value(superficie: str) -> float:
+    """Superficie en m² (NaN si absente)"""
+    match = AREA_PATTERN.search(str(superficie or ''))
+    if not match:
+        return math.nan
+    value = float(match.group(1).replace(',', '.'))
+    if match.group(2).lower().startswith('h'):
+        value *= 10_000
+    return value if value > 0 else math.nan
+
+
+def period_start(day: date, period: str) -> str:
+    """Début de la période (jour, ou lundi de la semaine) au format ISO"""
+    if period == WEEK:
+        day = day - timedelta(days=day.weekday())
+    return day.isoformat()
+
+
+class QuantileSketch:
+    """Histogramme à pas logarithmique pour estimer médiane et quantiles
+
+    Chaque valeur positive tombe dans le seau ceil(log(x) / log(gamma)):
+    l'erreur relative des quantiles est bornée par relative_accuracy et la
+    taille du sketch ne dépend que de l'étendue des valeurs. Deux sketches se
+    fusionnent en additionnant leurs seaux, ce qui permet les mises à jour
+    incrémentales des agrégats.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = defaultdict(int)
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        if not value > 0:
+            return
+        self.buckets[math.ceil(math.log(value) / self._log_gamma)] += 1
+        self.count += 1
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        for index, count in other.buckets.items():
+            self.buckets[index] += count
+        self.count += other.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return None
+
+    def to_json(self) -> str:
+        return json.dumps({'a': self.relative_accuracy, 'b': self.buckets})
+
+    @classmethod
+    def from_json(cls, text: Optional[str]) -> 'QuantileSketch':
+        if not text:
+            return cls()
+        state = json.loads(text)
+        sketch = cls(state['a'])
+        for index, count in state['b'].items():
+            sketch.buckets[int(index)] = count
+            sketch.count += count
+        return sketch
+
+
+class TrendRollups:
+    """Agrégats quotidiens et hebdomadaires des annonces nettoyées
+
+    Mis à jour de façon incrémentale à chaque sauvegarde (update): pour chaque
+    période, catégorie, type d'annonce et quartier, on conserve le nombre
+    d'annonces distinctes vues, les nouvelles et les retirées, et des sketches
+    de quantiles du prix et du prix au m². Le tableau de bord lit uniquement
+    ces agrégats (series), jamais les fichiers.
+
+    Les annonces sont suivies par listing_key dans leur catégorie; les
+    comptes regroupent les republications (cluster_id): un groupe est compté
+    une fois par période, nouveau si aucune de ses annonces n'avait été vue,
+    retiré quand plus aucune n'est active. Une annonce est retirée lorsqu'elle
+    n'a pas été revue depuis removal_days lors d'un scraping de sa catégorie:
+    avec des scrapings partiels (quelques pages), les annonces anciennes
+    sortent des premières pages et sont comptées comme retirées.
+    """
+
+    def __init__(self, db_path: str = ROLLUPS_PATH, removal_days: int = REMOVAL_DAYS):
+        self.db_path = db_path
+        self.removal_days = removal_days
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS listings (
+                    category TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    cluster_id TEXT NOT NULL,
+                    type_annonce TEXT NOT NULL,
+                    quartier TEXT NOT NULL,
+                    first_seen TEXT NOT NULL,
+                    last_seen TEXT NOT NULL,
+                    removed INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (category, key)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_listings_active ON listings (category, removed, last_seen)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_listings_cluster ON listings (category, cluster_id)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS rollups (
+                    period TEXT NOT NULL,
+                    period_start TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    type_annonce TEXT NOT NULL,
+                    quartier TEXT NOT NULL,
+                    listings INTEGER NOT NULL DEFAULT 0,
+                    new_listings INTEGER NOT NULL DEFAULT 0,
+                    removed_listings INTEGER NOT NULL DEFAULT 0,
+                    price_sketch TEXT,
+                    price_m2_sketch TEXT,
+                    PRIMARY KEY (period, period_start, category, type_annonce, quartier)
+                )
+            """)
+            # Fichiers déjà agrégés (une sauvegarde n'est comptée qu'une fois)
+            conn.execute("CREATE TABLE IF NOT EXISTS sources (path TEXT PRIMARY KEY, processed REAL)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def update(self, df, category: str, source: str = "", observed: Optional[datetime] = None) -> int:
+        """Ajoute un jeu d'annonces nettoyées aux agrégats; retourne le nombre d'annonces prises en compte"""
+        observed = observed or datetime.now()
+        today = observed.date()
+        today_iso = today.isoformat()
+        starts = {period: period_start(today, period) for period in PERIODS}
+
+        records = df.fillna('').to_dict('records')
+        listings = {}
+        for record in records:
+            listings.setdefault(listing_key(record), record)
+        clusters = {key: str(record.get('cluster_id') or key) for key, record in listings.items()}
+
+        # Agrégats touchés: (période, type, quartier) -> [annonces, nouvelles, retirées, prix, prix/m²]
+        deltas = defaultdict(lambda: [0, 0, 0, QuantileSketch(), QuantileSketch()])
+
+        with self._connect() as conn:
+            if source:
+                if conn.execute("SELECT 1 FROM sources WHERE path = ?", (source,)).fetchone():
+                    return 0
+                conn.execute("INSERT INTO sources (path, processed) VALUES (?, ?)", (source, observed.timestamp()))
+
+            # Dernière observation de chaque groupe avant cette mise à jour: par ses
+            # annonces déjà connues (même si leur cluster_id a changé) ou par son identifiant
+            cluster_seen = {}
+            for column, values in (('key', list(listings)), ('cluster_id', list(set(clusters.values())))):
+                for start in range(0, len(values), 500):
+                    chunk = values[start:start + 500]
+                    rows = conn.execute(
+                        f"""
+                        SELECT {column} AS value, MAX(last_seen) AS last_seen FROM listings
+                        WHERE category = ? AND {column} IN ({','.join('?' * len(chunk))}) GROUP BY {column}
+                        """,
+                        [category] + chunk
+                    ).fetchall()
+                    for row in rows:
+                        cluster_id = clusters[row['value']] if column == 'key' else row['value']
+                        cluster_seen[cluster_id] = max(cluster_seen.get(cluster_id, ''), row['last_seen'])
+
+            upserts = []
+            counted = set()
+            for key, record in listings.items():
+                type_annonce = str(record.get('type_annonce') or '')
+                quartier = str(record.get('quartier') or '')
+                cluster_id = clusters[key]
+                upserts.append((category, key, cluster_id, type_annonce, quartier, today_iso, today_iso))
+                # Republications: un seul comptage par groupe
+                if cluster_id in counted:
+                    continue
+                counted.add(cluster_id)
+                last_seen = cluster_seen.get(cluster_id)
+                # Prix en quarantaine (téléphone, loyer parmi les ventes...): annonce comptée, prix ignoré
+                price = math.nan if record.get('quarantined') in (True, 'True') else price_value(record.get('prix', ''))
+                price_m2 = price / area_value(record.get('superficie', ''))
+
+                for period, start in starts.items():
+                    # Déjà comptée dans cette période: seule la première observation compte
+                    if last_seen is not None and last_seen >= start:
+                        continue
+                    for place in (quartier, ALL_QUARTIERS):
+                        delta = deltas[(period, type_annonce, place)]
+                        delta[0] += 1
+                        if last_seen is None:
+                            delta[1] += 1
+                        delta[3].add(price)
+                        delta[4].add(price_m2)
+
+            conn.executemany(
+                """
+                INSERT INTO listings (category, key, cluster_id, type_annonce, quartier, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(category, key) DO UPDATE SET
+                    last_seen = MAX(last_seen, excluded.last_seen), removed = 0, cluster_id = excluded.cluster_id,
+                    type_annonce = excluded.type_annonce, quartier = excluded.quartier
+                """,
+                upserts
+            )
+
+            # Annonces de la catégorie disparues depuis removal_days
+            cutoff = (today - timedelta(days=self.removal_days)).isoformat()
+            gone = conn.execute(
+                """
+                SELECT key, cluster_id, type_annonce, quartier FROM listings
+                WHERE category = ? AND removed = 0 AND last_seen < ?
+                """,
+                (category, cutoff)
+            ).fetchall()
+            conn.executemany("UPDATE listings SET removed = 1 WHERE category = ? AND key = ?",
+                             [(category, row['key']) for row in gone])
+
+            # Un groupe n'est retiré que si aucune de ses annonces n'est encore active
+            gone_clusters = {}
+            for row in gone:
+                gone_clusters.setdefault(row['cluster_id'], row)
+            active = set()
+            cluster_ids = list(gone_clusters)
+            for start in range(0, len(cluster_ids), 500):
+                chunk = cluster_ids[start:start + 500]
+                active.update(row['cluster_id'] for row in conn.execute(
+                    f"""
+                    SELECT DISTINCT cluster_id FROM listings
+                    WHERE category = ? AND removed = 0 AND cluster_id IN ({','.join('?' * len(chunk))})
+                    """,
+                    [category] + chunk
+                ))
+            for cluster_id, row in gone_clusters.items():
+                if cluster_id in active:
+                    continue
+                for period in PERIODS:
+                    for place in (row['quartier'], ALL_QUARTIERS):
+                        deltas[(period, row['type_annonce'], place)][2] += 1
+
+            for (period, type_annonce, quartier), delta in deltas.items():
+                self._merge_rollup(conn, (period, starts[period], category, type_annonce, quartier), delta)
+
+        return len(listings)
+
+    def _merge_rollup(self, conn: sqlite3.Connection, rollup_key: Tuple, delta: List) -> None:
+        row = conn.execute(
+            """
+            SELECT price_sketch, price_m2_sketch FROM rollups
+            WHERE period = ? AND period_start = ? AND category = ? AND type_annonce = ? AND quartier = ?
+            """,
+            rollup_key
+        ).fetchone()
+
+        price_sketch = QuantileSketch.from_json(row['price_sketch'] if row else None)
+        price_sketch.merge(delta[3])
+        price_m2_sketch = QuantileSketch.from_json(row['price_m2_sketch'] if row else None)
+        price_m2_sketch.merge(delta[4])
+
+        conn.execute(
+            """
+            INSERT INTO rollups (period, period_start, category, type_annonce, quartier,
+                                 listings, new_listings, removed_listings, price_sketch, price_m2_sketch)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(period, period_start, category, type_annonce, quartier) DO UPDATE SET
+                listings = listings + excluded.listings,
+                new_listings = new_listings + excluded.new_listings,
+                removed_listings = removed_listings + excluded.removed_listings,
+                price_sketch = excluded.price_sketch,
+                price_m2_sketch = excluded.price_m2_sketch
+            """,
+            (*rollup_key, delta[0], delta[1], delta[2], price_sketch.to_json(), price_m2_sketch.to_json())
+        )
+
+    def update_from_file(self, filepath: str, category: str = "", observed: Optional[datetime] = None) -> int:
+        """Agrège un fichier CSV nettoyé (ignoré s'il l'a déjà été)"""
+        import pandas as pd
+
+        with self._connect() as conn:
+            if conn.execute("SELECT 1 FROM sources WHERE path = ?", (filepath,)).fetchone():
+                return 0
+
+        category = category or os.path.basename(filepath).split('_')[0]
+        observed = observed or datetime.fromtimestamp(os.stat(filepath).st_mtime)
+        return self.update(pd.read_csv(filepath), category, source=filepath, observed=observed)
+
+    def backfill(self, entries: List[Dict]) -> int:
+        """Agrège les fichiers du catalogue pas encore pris en compte, du plus ancien au plus récent"""
+        processed = 0
+        for entry in sorted(entries, key=lambda entry: entry['created'] or 0):
+            try:
+                processed += self.update_from_file(
+                    entry['path'], entry['category'],
+                    datetime.fromtimestamp(entry['created']) if entry['created'] else None
+                )
+            except (OSError, ValueError):
+                continue
+        return processed
+
+    def dimensions(self) -> Dict[str, List[str]]:
+        """Valeurs disponibles pour les filtres (catégories, types, quartiers)"""
+        with self._connect() as conn:
+            return {
+                column: [row[0] for row in conn.execute(f"SELECT DISTINCT {column} FROM rollups ORDER BY {column}")]
+                for column in ('category', 'type_annonce', 'quartier')
+            }
+
+    def series(self, period: str, category: str, type_annonce: str, quartier: str = ALL_QUARTIERS,
+               quantiles: Tuple[float, ...] = (0.25, 0.5, 0.75)) -> List[Dict]:
+        """Série temporelle d'un agrégat, par ordre chronologique"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT * FROM rollups
+                WHERE period = ? AND category = ? AND type_annonce = ? AND quartier = ?
+                ORDER BY period_start
+                """,
+                (period, category, type_annonce, quartier)
+            ).fetchall()
+
+        points = []
+        for row in rows:
+            point = {
+                'period_start': row['period_start'],
+                'listings': row['listings'],
+                'new_listings': row['new_listings'],
+                'removed_listings': row['removed_listings']
+            }
+            for name in ('price', 'price_m2'):
+                sketch = QuantileSketch.from_json(row[f'{name}_sketch'])
+                point[f'{name}_count'] = sketch.count
+                for q in quantiles:
+                    point[f'{name}_q{int(q * 100)}'] = sketch.quantile(q)
+            points.append(point)
+        return points
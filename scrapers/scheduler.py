@@ -0,0 +1,268 @@
+import argparse
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import List, Dict, Optional, Callable
+
+from scrapers.jobs import SCRAPER_CLASSES
+from scrapers.pipeline import split_dual
+from scrapers.transport import get_transport, TRANSPORTS
+from scrapers.base import listing_key
+from scrapers.profiling import ScrapeProfiler
+
+STATE_PATH = 'data/scheduler_state.json'
+
+
+class CategorySchedule:
+    """État de planification d'une catégorie"""
+
+    def __init__(self, category: str, interval: float, next_run: float = 0.0,
+                 new_ratio: Optional[float] = None, seen: Optional[List[str]] = None):
+        self.category = category
+        self.interval = interval
+        self.next_run = next_run
+        # Moyenne mobile de la proportion de nouvelles annonces par passage
+        self.new_ratio = new_ratio
+        self.seen = dict.fromkeys(seen or [])
+
+    def to_dict(self, max_seen: int) -> Dict:
+        return {
+            'interval': self.interval,
+            'next_run': self.next_run,
+            'new_ratio': self.new_ratio,
+            'seen': list(self.seen)[-max_seen:]
+        }
+
+
+class AdaptiveScheduler:
+    """Planificateur de scraping dont la fréquence s'adapte au rythme de publication
+
+    Après chaque passage, l'intervalle d'une catégorie est multiplié par
+    target_new_ratio / new_ratio (borné entre 0.5x et 2x puis entre min_interval
+    et max_interval): une catégorie où beaucoup d'annonces sont nouvelles est
+    visitée plus souvent, une catégorie calme l'est moins. Le premier passage
+    d'une catégorie ne fait que mémoriser les annonces présentes: toutes y
+    seraient nouvelles, ce qui fausserait la moyenne.
+
+    clock et sleep sont injectables pour piloter le planificateur avec une
+    horloge factice.
+    """
+
+    def __init__(self, categories: Optional[List[str]] = None, mode: str = 'cleaned',
+                 num_pages: Optional[int] = 1, base_url: str = "https://sn.coinafrique.com",
+                 transport: Optional[str] = None,
+                 min_interval: float = 15 * 60, max_interval: float = 24 * 3600,
+                 initial_interval: float = 3600, target_new_ratio: float = 0.3,
+                 smoothing: float = 0.5, max_seen: int = 20000,
+                 state_path: Optional[str] = STATE_PATH, save_results: bool = True,
+                 scraper_factory: Optional[Callable] = None, profile: bool = False,
+                 clock: Callable[[], float] = time.time,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.mode = mode
+        self.num_pages = num_pages
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_new_ratio = target_new_ratio
+        self.smoothing = smoothing
+        self.max_seen = max_seen
+        self.state_path = state_path
+        self.save_results = save_results
+        self.clock = clock
+        self.sleep = sleep
+        self.stop_event = threading.Event()
+
+        if scraper_factory is None:
+            # Un profiler neuf par passage: le profil est enregistré à côté du fichier produit
+            scraper_factory = lambda: SCRAPER_CLASSES[mode](
+                base_url=base_url, silent=True, transport=get_transport(transport),
+                profiler=ScrapeProfiler() if profile else None
+            )
+        self.scraper_factory = scraper_factory
+
+        if categories is None:
+            categories = list(scraper_factory().category_urls)
+
+        self.schedules = {
+            category: CategorySchedule(category, initial_interval)
+            for category in categories
+        }
+        self.load_state()
+
+    def load_state(self) -> None:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        with open(self.state_path, encoding='utf-8') as f:
+            state = json.load(f)
+        for category, values in state.get(self.mode, {}).items():
+            if category in self.schedules:
+                self.schedules[category] = CategorySchedule(category, **values)
+
+    def save_state(self) -> None:
+        if not self.state_path:
+            return
+        state = {}
+        if os.path.exists(self.state_path):
+            with open(self.state_path, encoding='utf-8') as f:
+                state = json.load(f)
+        state[self.mode] = {
+            category: schedule.to_dict(self.max_seen)
+            for category, schedule in self.schedules.items()
+        }
+        os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+
+    def due_categories(self) -> List[str]:
+        now = self.clock()
+        due = [s for s in self.schedules.values() if s.next_run <= now]
+        return [s.category for s in sorted(due, key=lambda s: s.next_run)]
+
+    def seconds_until_next_run(self) -> float:
+        next_run = min(s.next_run for s in self.schedules.values())
+        return max(next_run - self.clock(), 0.0)
+
+    def run_category(self, category: str) -> Dict:
+        """Scrape une catégorie, met à jour son intervalle et retourne un rapport"""
+        schedule = self.schedules[category]
+        started = self.clock()
+
+        scraper = self.scraper_factory()
+        data = scraper.scrape_category(
+            category, self.num_pages,
+            progress_callback=lambda page, num_pages, page_data: None,
+            stop_event=self.stop_event
+        )
+        pairs = data
+        if self.mode == 'both':
+            data = split_dual(pairs)[1]
+
+        keys = [listing_key(listing) for listing in data]
+        first_run = not schedule.seen
+        new_keys = [key for key in dict.fromkeys(keys) if key not in schedule.seen]
+        for key in new_keys:
+            schedule.seen[key] = None
+
+        filepath = ""
+        if self.save_results and new_keys:
+            timestamp = datetime.fromtimestamp(started).strftime("%Y%m%d_%H%M%S")
+            if self.mode == 'both':
+                filepath = scraper.save_both(pairs, category, timestamp)[1]
+            else:
+                filepath = scraper.save_to_csv(data, f"{category}_{self.mode}_{timestamp}.csv")
+
+        if not (first_run and keys):
+            self.adjust(schedule, len(new_keys), len(keys))
+        schedule.next_run = self.clock() + schedule.interval
+
+        return {
+            'category': category,
+            'listings': len(keys),
+            'new_listings': len(new_keys),
+            'interval': schedule.interval,
+            'next_run': schedule.next_run,
+            'filepath': filepath,
+            'errors': list(scraper.errors),
+            'profile': scraper.profiler.report()
+        }
+
+    def adjust(self, schedule: CategorySchedule, new_count: int, total: int) -> None:
+        """Adapte l'intervalle selon la proportion de nouvelles annonces"""
+        if total == 0:
+            # Page vide ou erreur réseau: on ralentit sans toucher à la moyenne
+            factor = 2.0
+        else:
+            ratio = new_count / total
+            if schedule.new_ratio is None:
+                schedule.new_ratio = ratio
+            else:
+                schedule.new_ratio = self.smoothing * ratio + (1 - self.smoothing) * schedule.new_ratio
+            factor = self.target_new_ratio / max(schedule.new_ratio, 1e-6)
+
+        factor = min(max(factor, 0.5), 2.0)
+        schedule.interval = min(max(schedule.interval * factor, self.min_interval), self.max_interval)
+
+    def run_pending(self) -> List[Dict]:
+        """Exécute les catégories arrivées à échéance"""
+        reports = []
+        for category in self.due_categories():
+            if self.stop_event.is_set():
+                break
+            reports.append(self.run_category(category))
+        if reports:
+            self.save_state()
+        return reports
+
+    def run_forever(self, max_cycles: Optional[int] = None,
+                    on_report: Optional[Callable[[Dict], None]] = None) -> None:
+        cycles = 0
+        while not self.stop_event.is_set():
+            for report in self.run_pending():
+                if on_report:
+                    on_report(report)
+            cycles += 1
+            if max_cycles is not None and cycles >= max_cycles:
+                break
+            self.sleep(self.seconds_until_next_run())
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+
+def print_profile(profile: Dict, top: int = 5) -> None:
+    """Résumé texte d'un profil de scraping"""
+    for stage in profile['stages']:
+        print(f"  {stage['stage']:<16}{stage['seconds']:>9.3f} s  pic {stage['peak_kb']:>9.1f} Ko  ({stage['calls']} appels)")
+    print("  Points chauds (temps propre):")
+    for hotspot in profile['hotspots'][:top]:
+        print(f"    {hotspot['tottime']:>8.3f} s  {hotspot['calls']:>8}x  {hotspot['function']} ({hotspot['location']})")
+    if profile['peak_stage']:
+        print(f"  Pic d'allocations: {profile['peak_kb']:.1f} Ko pendant « {profile['peak_stage']} »")
+        for allocation in profile['peak_allocations'][:top]:
+            print(f"    {allocation['size_kb']:>9.1f} Ko  {allocation['location']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scraping périodique CoinAfrique à fréquence adaptative")
+    parser.add_argument('--categories', nargs='+', help="Catégories à planifier (toutes par défaut)")
+    parser.add_argument('--mode', choices=sorted(SCRAPER_CLASSES), default='cleaned')
+    parser.add_argument('--pages', type=int, default=1, help="Pages par passage")
+    parser.add_argument('--all-pages', action='store_true', help="Parcourir toutes les pages à chaque passage")
+    parser.add_argument('--base-url', default="https://sn.coinafrique.com")
+    parser.add_argument('--transport', choices=sorted(TRANSPORTS), help="Backend HTTP")
+    parser.add_argument('--min-interval', type=float, default=15 * 60, help="Intervalle minimal (secondes)")
+    parser.add_argument('--max-interval', type=float, default=24 * 3600, help="Intervalle maximal (secondes)")
+    parser.add_argument('--once', action='store_true', help="Un seul passage sur les catégories échues")
+    parser.add_argument('--profile', action='store_true',
+                        help="Profile chaque passage (cProfile + tracemalloc), enregistré à côté des données")
+    args = parser.parse_args()
+
+    scheduler = AdaptiveScheduler(
+        categories=args.categories, mode=args.mode, num_pages=None if args.all_pages else args.pages,
+        base_url=args.base_url, transport=args.transport,
+        min_interval=args.min_interval, max_interval=args.max_interval, profile=args.profile
+    )
+
+    def print_report(report):
+        next_run = datetime.fromtimestamp(report['next_run']).strftime('%d/%m/%Y %H:%M')
+        print(
+            f"{report['category']}: {report['new_listings']}/{report['listings']} nouvelles annonces, "
+            f"prochain passage {next_run} (intervalle {report['interval'] / 60:.0f} min)"
+        )
+        for error in report['errors']:
+            print(f"  {error}")
+        if report['profile']:
+            print_profile(report['profile'])
+
+    try:
+        scheduler.run_forever(max_cycles=1 if args.once else None, on_report=print_report)
+    except KeyboardInterrupt:
+        scheduler.stop()
+        scheduler.save_state()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import asyncio
+import importlib.util
+import os
+import threading
+from typing import List, Dict, Optional, Union
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'fr-FR,fr;q=0.9,en;q=0.8',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive'
+}
+
+# Backend par défaut, modifiable sans toucher au code
+DEFAULT_TRANSPORT = os.environ.get('COINAFRIQUE_TRANSPORT', 'requests')
+
+
+def _module_available(name: str) -> bool:
+    # Recherche sans importer le module (httpx, brotli... restent chargés à la demande)
+    return importlib.util.find_spec(name) is not None
+
+
+def supported_encodings() -> str:
+    """Accept-Encoding limité aux formats que l'on sait décompresser
+
+    Annoncer 'br' sans le module brotli renvoie un contenu illisible.
+    """
+    encodings = ['gzip', 'deflate']
+    if _module_available('brotli') or _module_available('brotlicffi'):
+        encodings.append('br')
+    return ', '.join(encodings)
+
+
+def build_headers(headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    merged = dict(DEFAULT_HEADERS)
+    merged['Accept-Encoding'] = supported_encodings()
+    merged.update(headers or {})
+    return merged
+
+
+class RequestsTransport:
+    """Transport synchrone basé sur requests.Session (pool de connexions urllib3)"""
+
+    name = 'requests'
+
+    def __init__(self, headers: Optional[Dict[str, str]] = None, pool_size: int = 10, timeout: float = 30):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(build_headers(headers))
+
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get(self, url: str) -> bytes:
+        """Télécharge une URL et retourne le corps décompressé"""
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.content
+
+    def get_many(self, urls: List[str]) -> List[Union[bytes, Exception]]:
+        results = []
+        for url in urls:
+            try:
+                results.append(self.get(url))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class HttpxTransport:
+    """Transport asynchrone basé sur httpx.AsyncClient
+
+    Le client tourne dans une boucle asyncio dédiée (thread de fond), ce qui
+    conserve le contrat synchrone de get() tout en permettant des requêtes
+    concurrentes avec get_many(). HTTP/2 est activé si le paquet h2 est installé.
+    """
+
+    name = 'httpx'
+
+    def __init__(self, headers: Optional[Dict[str, str]] = None, pool_size: int = 10,
+                 timeout: float = 30, http2: bool = True):
+        import httpx
+
+        self.http2 = http2 and _module_available('h2')
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="httpx-transport", daemon=True)
+        self._thread.start()
+
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+
+        async def create_client():
+            return httpx.AsyncClient(
+                headers=build_headers(headers),
+                limits=limits,
+                timeout=timeout,
+                http2=self.http2,
+                follow_redirects=True
+            )
+
+        self._client = self._submit(create_client())
+
+    def _submit(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    async def aget(self, url: str) -> bytes:
+        response = await self._client.get(url)
+        response.raise_for_status()
+        return response.content
+
+    async def aget_many(self, urls: List[str]) -> List[Union[bytes, Exception]]:
+        return await asyncio.gather(*(self.aget(url) for url in urls), return_exceptions=True)
+
+    def get(self, url: str) -> bytes:
+        """Télécharge une URL et retourne le corps décompressé"""
+        return self._submit(self.aget(url))
+
+    def get_many(self, urls: List[str]) -> List[Union[bytes, Exception]]:
+        """Télécharge plusieurs URL en parallèle (limité par pool_size)"""
+        return self._submit(self.aget_many(urls))
+
+    def close(self) -> None:
+        self._submit(self._client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+
+TRANSPORTS = {
+    'requests': RequestsTransport,
+    'httpx': HttpxTransport
+}
+
+_shared_transports = {}
+_shared_lock = threading.Lock()
+
+
+def available_transports() -> List[str]:
+    """Backends utilisables dans l'environnement courant"""
+    names = ['requests']
+    if _module_available('httpx'):
+        names.append('httpx')
+    return names
+
+
+def get_transport(name: Optional[str] = None, pool_size: int = 10):
+    """Retourne un transport partagé par le processus
+
+    Les connexions (et les handshakes TLS) sont ainsi réutilisées d'un
+    scraping à l'autre au lieu d'ouvrir une nouvelle session à chaque clic.
+    """
+    name = name or DEFAULT_TRANSPORT
+    if name not in TRANSPORTS:
+        raise ValueError(f"Transport '{name}' inconnu (disponibles: {', '.join(TRANSPORTS)})")
+
+    key = (name, pool_size)
+    with _shared_lock:
+        if key not in _shared_transports:
+            _shared_transports[key] = TRANSPORTS[name](pool_size=pool_size)
+        return _shared_transports[key]
@@ -1,189 +1,83 @@
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
-import time
 import re
-from typing import List, Dict, Optional
-from urllib.parse import urljoin
-import streamlit as st
-import os
+from typing import Dict
+from scrapers.base import CoinAfriqueScraperBase
 
-class CoinAfriqueScraperRaw:
+class CoinAfriqueScraperRaw(CoinAfriqueScraperBase):
     """Web Scraper sans nettoyage des données"""
-    
-    def __init__(self, base_url: str = "https://sn.coinafrique.com"):
-        self.base_url = base_url
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'fr-FR,fr;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive'
-        })
-        
-        self.category_urls = {
-            'villas': f"{self.base_url}/categorie/villas",
-            'terrains': f"{self.base_url}/categorie/terrains", 
-            'appartements': f"{self.base_url}/categorie/appartements"
-        }
-    
-    def get_page_content(self, url: str, page_num: int = 1) -> Optional[BeautifulSoup]:
-        """Récupère le contenu d'une page"""
-        try:
-            if page_num > 1:
-                url = f"{url}?page={page_num}"
-            
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            return BeautifulSoup(response.content, 'html.parser')
-        except Exception as e:
-            st.error(f"Erreur lors du chargement de la page {page_num}: {str(e)}")
-            return None
-    
-    def extract_listings_from_page(self, soup: BeautifulSoup, category: str) -> List[Dict]:
-        """Extrait les annonces SANS nettoyage selon la catégorie et les variables spécifiées"""
-        listings_data = []
-        
-        # Trouver les images d'annonces
-        images = soup.find_all('img', src=re.compile(r'thumb_\d+'))
-        
-        for img in images:
-            try:
-                data = {}
-                
-                # Description brute depuis l'attribut alt
-                description_brute = img.get('alt', '')
-                
-                # Trouver le conteneur parent
-                container = img.find_parent(['div', 'article', 'section'])
-                
-                if container:
-                    # Lien vers l'annonce
-                    link = container.find('a', href=re.compile(r'/annonce/'))
-                    titre_brut = ""
-                    if link:
-                        titre_brut = link.get('title', '') or link.text
-                    
-                    # Texte complet du conteneur
-                    container_text = container.get_text()
-                    
-                    # Extraction de l'adresseE
-                    address_brut = ""
-                    if 'location_on' in container_text:
-                        location_match = re.search(r'location_on([^favorite_border\n]+)', container_text)
-                        if location_match:
-                            address_brut = location_match.group(1)
-                    
-                    # Prix
-                    prix_brut = ""
-                    price_patterns = [
-                        r'(\d+(?:\s\d+)*)\s*(?:CFA|F\s*CFA|FCFA)',
-                        r'(\d+(?:\.\d+)?)\s*(?:millions?|M)',
-                        r'(\d+[\d\s]*)'
-                    ]
-                    
-                    for pattern in price_patterns:
-                        price_match = re.search(pattern, container_text, re.IGNORECASE)
-                        if price_match:
-                            prix_brut = price_match.group(0)
-                            break
-                
-                else:
-                    titre_brut = ""
-                    address_brut = ""
-                    prix_brut = ""
-                
-                # Variables spécifiques selon la catégorie et l'énoncé
-                full_text = f"{description_brute} {titre_brut}"
-                
-                if category == 'villas':
-                    # V1: nombre pièces
-                    data['nombre_pieces'] = full_text
-                    
-                    # V2: nombre salle bain
-                    data['nombre_salle_bain'] = full_text
-                    
-                    # V3: superficie   
-                    data['superficie'] = full_text
-                    
-                    # V4: adresse
-                    data['adresse'] = address_brut
-                    
-                elif category == 'terrains':
-                    # V1: superficie
-                    data['superficie'] = full_text
-                    
-                    # V2: prix
-                    data['prix'] = prix_brut
-                    
-                    # V3: adresse
-                    data['adresse'] = address_brut
-                    
-                    # V4: image lien
-                    data['image_lien'] = img.get('src', '')
-                    
-                elif category == 'appartements':
-                    # V1: nombre pièces
-                    data['nombre_pieces'] = full_text
-                    
-                    # V2: nombre salle bain
-                    data['nombre_salle_bain'] = full_text
-                    
-                    # V3: superficie
-                    data['superficie'] = full_text
-                    
-                    # V4: adresse
-                    data['adresse'] = address_brut
-                
-                listings_data.append(data)
-                
-            except Exception:
-                continue
-        
-        return listings_data
-    
-    def scrape_category(self, category: str, num_pages: int = 1) -> List[Dict]:
-        """Scrape une catégorie complète SANS nettoyage"""
-        
-        if category not in self.category_urls:
-            st.error(f"Catégorie '{category}' non supportée")
-            return []
-        
-        all_data = []
-        url = self.category_urls[category]
-        
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
-        for page in range(1, num_pages + 1):
-            status_text.text(f"Web scraping page {page}/{num_pages} de {category}...")
-            
-            soup = self.get_page_content(url, page)
-            if not soup:
-                continue
-            
-            page_data = self.extract_listings_from_page(soup, category)
-            
-            if page_data:
-                all_data.extend(page_data)
-                status_text.text(f"Page {page}: {len(page_data)} annonces extraites")
-            else:
-                status_text.text(f"Page {page}: aucune annonce trouvée")
-            
-            progress_bar.progress(page / num_pages)
-            time.sleep(1)
-        
-        status_text.text(f"Web scraping terminé! {len(all_data)} annonces collectées.")
-        return all_data
-    
-    def save_to_csv(self, data: List[Dict], filename: str) -> str:
-        """Sauvegarde les données en CSV"""
-        if not data:
-            return ""
-        
-        df = pd.DataFrame(data)
-        os.makedirs('data/raw', exist_ok=True)
-        filepath = f"data/raw/{filename}"
-        df.to_csv(filepath, index=False, encoding='utf-8')
-        return filepath
\ No newline at end of file
+
+    mode = 'raw'
+    label = "Web scraping"
+
+    def build_record(self, card: Dict, category: str) -> Dict:
+        """Construit une annonce SANS nettoyage selon la catégorie et les variables spécifiées"""
+        data = {}
+
+        # Description brute depuis l'attribut alt
+        description_brute = card['description']
+
+        container_text = card['container_text']
+
+        if container_text is not None:
+            # Lien vers l'annonce
+            titre_brut = ""
+            if card['link_href'] is not None:
+                titre_brut = card['link_title'] or card['link_text']
+
+            # Extraction de l'adresse
+            address_brut = ""
+            if 'location_on' in container_text:
+                location_match = re.search(r'location_on([^favorite_border\n]+)', container_text)
+                if location_match:
+                    address_brut = location_match.group(1)
+
+            # Prix
+            prix_brut = card['prix']
+
+        else:
+            titre_brut = ""
+            address_brut = ""
+            prix_brut = ""
+
+        # Variables spécifiques selon la catégorie et l'énoncé
+        full_text = f"{description_brute} {titre_brut}"
+
+        if category == 'villas':
+            # V1: nombre pièces
+            data['nombre_pieces'] = full_text
+
+            # V2: nombre salle bain
+            data['nombre_salle_bain'] = full_text
+
+            # V3: superficie
+            data['superficie'] = full_text
+
+            # V4: adresse
+            data['adresse'] = address_brut
+
+        elif category == 'terrains':
+            # V1: superficie
+            data['superficie'] = full_text
+
+            # V2: prix
+            data['prix'] = prix_brut
+
+            # V3: adresse
+            data['adresse'] = address_brut
+
+            # V4: image lien
+            data['image_lien'] = card['image_lien']
+
+        elif category == 'appartements':
+            # V1: nombre pièces
+            data['nombre_pieces'] = full_text
+
+            # V2: nombre salle bain
+            data['nombre_salle_bain'] = full_text
+
+            # V3: superficie
+            data['superficie'] = full_text
+
+            # V4: adresse
+            data['adresse'] = address_brut
+
+        return data
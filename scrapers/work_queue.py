@@ -0,0 +1,624 @@
+import abc
+import argparse
+import hmac
+import json
+import os
+import secrets
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Optional, Tuple, Callable
+
+import requests
+
+from scrapers.jobs import SCRAPER_CLASSES
+from scrapers.base import listing_key
+from scrapers.transport import get_transport, TRANSPORTS
+
+QUEUE_PATH = 'data/crawl_queue.db'
+
+# Jeton partagé entre le serveur de file et ses clients (en-tête TOKEN_HEADER)
+TOKEN_ENV = 'CRAWL_QUEUE_TOKEN'
+TOKEN_HEADER = 'X-Queue-Token'
+
+# Statuts des tâches
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def new_run_id() -> str:
+    return datetime.now().strftime("%Y%m%d_%H%M%S_") + uuid.uuid4().hex[:6]
+
+
+def page_task(category: str, page: int, mode: str = 'cleaned', discover: bool = False,
+              run: str = "") -> Dict:
+    """Tâche de scraping d'une page de catégorie (seul type de tâche)
+
+    discover=True: la tâche ajoute les pages suivantes d'après la pagination
+    (mode toutes pages). run identifie le passage de scraping (voir put).
+    """
+    return {
+        'task_key': f"{mode}:{category}:page={page}",
+        'kind': 'page',
+        'category': category,
+        'page': page,
+        'mode': mode,
+        'discover': discover,
+        'run': run
+    }
+
+
+class CrawlQueue(abc.ABC):
+    """File de tâches de scraping partagée entre plusieurs workers
+
+    Contrat commun aux backends:
+    - put() ignore les tâches dont la clé existe déjà (dé-duplication), sauf
+      avec reset=True: une tâche terminée ou en échec d'un autre passage (run)
+      est remise en attente pour ce passage;
+    - lease() réserve une tâche pour lease_seconds; une réservation expirée
+      peut être reprise par un autre worker;
+    - complete() n'est accepté que pour la réservation en cours (jeton) et
+      enregistre les annonces une seule fois par clé d'annonce (une annonce
+      revue lors d'un passage suivant est mise à jour), dans la même
+      transaction que la clôture de la tâche;
+    - fail() remet la tâche en attente avec un délai croissant, ou la marque
+      en échec après max_attempts tentatives.
+    """
+
+    @abc.abstractmethod
+    def put(self, tasks: List[Dict], reset: bool = False) -> int:
+        ...
+
+    @abc.abstractmethod
+    def lease(self, worker_id: str, lease_seconds: float = 120) -> Optional[Dict]:
+        ...
+
+    @abc.abstractmethod
+    def complete(self, task_key: str, token: str, listings: List[Dict],
+                 new_tasks: Optional[List[Dict]] = None) -> Optional[int]:
+        ...
+
+    @abc.abstractmethod
+    def fail(self, task_key: str, token: str, error: str) -> bool:
+        ...
+
+    @abc.abstractmethod
+    def stats(self) -> Dict:
+        ...
+
+
+class SQLiteCrawlQueue(CrawlQueue):
+    """Backend local (fichier SQLite), utilisable par plusieurs processus d'une même machine
+
+    clock est injectable pour tester les réservations expirées et les délais.
+    """
+
+    def __init__(self, db_path: str = QUEUE_PATH, max_attempts: int = 3, retry_delay: float = 30,
+                 clock: Callable[[], float] = time.time):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.clock = clock
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    task_key TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    category TEXT,
+                    page INTEGER,
+                    mode TEXT,
+                    discover INTEGER DEFAULT 0,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER DEFAULT 0,
+                    available_at REAL DEFAULT 0,
+                    lease_owner TEXT,
+                    lease_token TEXT,
+                    lease_expires REAL,
+                    last_error TEXT,
+                    created REAL,
+                    run TEXT DEFAULT ''
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, available_at)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS listings (
+                    listing_key TEXT NOT NULL,
+                    mode TEXT NOT NULL,
+                    category TEXT,
+                    task_key TEXT,
+                    data TEXT,
+                    created REAL,
+                    run TEXT DEFAULT '',
+                    PRIMARY KEY (listing_key, mode)
+                )
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: transactions explicites (BEGIN IMMEDIATE) pour les réservations
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _insert_tasks(self, conn: sqlite3.Connection, tasks: List[Dict], reset: bool = False) -> int:
+        now = self.clock()
+        before = conn.total_changes
+        # reset: une tâche close (terminée ou en échec) d'un autre passage est réarmée;
+        # celles en attente ou réservées suivent leur cours
+        conflict = f"""
+            ON CONFLICT (task_key) DO UPDATE SET
+                status = '{PENDING}', attempts = 0, available_at = 0, lease_owner = NULL,
+                lease_token = NULL, lease_expires = NULL, last_error = NULL,
+                discover = excluded.discover, created = excluded.created, run = excluded.run
+            WHERE tasks.status IN ('{DONE}', '{FAILED}') AND tasks.run IS NOT excluded.run
+        """ if reset else "ON CONFLICT (task_key) DO NOTHING"
+        conn.executemany(
+            f"""
+            INSERT INTO tasks (task_key, kind, category, page, mode, discover, created, run)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            {conflict}
+            """,
+            [
+                (t['task_key'], t['kind'], t.get('category'), t.get('page'), t.get('mode', 'cleaned'),
+                 int(bool(t.get('discover'))), now, t.get('run', ""))
+                for t in tasks
+            ]
+        )
+        return conn.total_changes - before
+
+    def put(self, tasks: List[Dict], reset: bool = False) -> int:
+        """Ajoute des tâches; retourne le nombre de tâches nouvelles ou réarmées
+
+        reset=True relance un scraping déjà fait: les tâches closes d'un autre
+        passage que celui des tâches fournies sont remises en attente.
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            added = self._insert_tasks(conn, tasks, reset)
+            conn.execute("COMMIT")
+            return added
+        finally:
+            conn.close()
+
+    def lease(self, worker_id: str, lease_seconds: float = 120) -> Optional[Dict]:
+        now = self.clock()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                """
+                SELECT * FROM tasks
+                WHERE (status = ? AND available_at <= ?) OR (status = ? AND lease_expires < ?)
+                ORDER BY created, page
+                LIMIT 1
+                """,
+                (PENDING, now, LEASED, now)
+            ).fetchone()
+
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            token = uuid.uuid4().hex
+            conn.execute(
+                """
+                UPDATE tasks SET status = ?, lease_owner = ?, lease_token = ?, lease_expires = ?,
+                                 attempts = attempts + 1
+                WHERE task_key = ?
+                """,
+                (LEASED, worker_id, token, now + lease_seconds, row['task_key'])
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+        task = dict(row)
+        task['discover'] = bool(task['discover'])
+        task.update(status=LEASED, lease_owner=worker_id, lease_token=token,
+                    lease_expires=now + lease_seconds, attempts=task['attempts'] + 1)
+        return task
+
+    def complete(self, task_key: str, token: str, listings: List[Dict],
+                 new_tasks: Optional[List[Dict]] = None) -> Optional[int]:
+        """Clôt une tâche et enregistre ses annonces
+
+        listings: [{'listing_key', 'mode', 'category', 'data'}]. Retourne le
+        nombre d'annonces nouvelles pour le passage de la tâche (une annonce
+        connue d'un passage précédent est mise à jour et comptée), ou None si
+        la réservation n'est plus valide (expirée et reprise par un autre
+        worker): les résultats sont alors ignorés. new_tasks n'est ajouté que
+        si la page a apporté au moins une annonce nouvelle, ce qui arrête la
+        découverte sur une page répétée.
+        """
+        now = self.clock()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT status, lease_token, run FROM tasks WHERE task_key = ?", (task_key,)
+            ).fetchone()
+            if row is None or row['status'] != LEASED or row['lease_token'] != token:
+                conn.execute("ROLLBACK")
+                return None
+
+            # Une annonce n'est comptée (et mise à jour) qu'une fois par passage
+            before = conn.total_changes
+            conn.executemany(
+                """
+                INSERT INTO listings (listing_key, mode, category, task_key, data, created, run)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (listing_key, mode) DO UPDATE SET
+                    category = excluded.category, task_key = excluded.task_key,
+                    data = excluded.data, run = excluded.run
+                WHERE listings.run IS NOT excluded.run
+                """,
+                [
+                    (l['listing_key'], l['mode'], l.get('category'), task_key,
+                     json.dumps(l['data'], ensure_ascii=False), now, row['run'])
+                    for l in listings
+                ]
+            )
+            inserted = conn.total_changes - before
+
+            if new_tasks and inserted:
+                self._insert_tasks(conn, [dict(task, run=row['run']) for task in new_tasks], reset=True)
+
+            conn.execute(
+                "UPDATE tasks SET status = ?, lease_token = NULL, last_error = NULL WHERE task_key = ?",
+                (DONE, task_key)
+            )
+            conn.execute("COMMIT")
+            return inserted
+        finally:
+            conn.close()
+
+    def fail(self, task_key: str, token: str, error: str) -> bool:
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT status, lease_token, attempts FROM tasks WHERE task_key = ?", (task_key,)
+            ).fetchone()
+            if row is None or row['status'] != LEASED or row['lease_token'] != token:
+                conn.execute("ROLLBACK")
+                return False
+
+            if row['attempts'] >= self.max_attempts:
+                status, available_at = FAILED, 0
+            else:
+                status = PENDING
+                available_at = self.clock() + self.retry_delay * 2 ** (row['attempts'] - 1)
+
+            conn.execute(
+                """
+                UPDATE tasks SET status = ?, available_at = ?, lease_token = NULL, last_error = ?
+                WHERE task_key = ?
+                """,
+                (status, available_at, error, task_key)
+            )
+            conn.execute("COMMIT")
+            return True
+        finally:
+            conn.close()
+
+    def stats(self) -> Dict:
+        conn = self._connect()
+        try:
+            counts = {status: 0 for status in (PENDING, LEASED, DONE, FAILED)}
+            for row in conn.execute("SELECT status, COUNT(*) AS n FROM tasks GROUP BY status"):
+                counts[row['status']] = row['n']
+            listings = {
+                row['mode']: row['n']
+                for row in conn.execute("SELECT mode, COUNT(*) AS n FROM listings GROUP BY mode")
+            }
+        finally:
+            conn.close()
+        return {'tasks': counts, 'listings': listings}
+
+    def iter_listings(self, mode: str, category: Optional[str] = None) -> List[Dict]:
+        """Annonces fusionnées d'un mode, dans l'ordre d'arrivée"""
+        query = "SELECT data FROM listings WHERE mode = ?"
+        params: Tuple = (mode,)
+        if category:
+            query += " AND category = ?"
+            params += (category,)
+        conn = self._connect()
+        try:
+            rows = conn.execute(query + " ORDER BY created, rowid", params).fetchall()
+        finally:
+            conn.close()
+        return [json.loads(row['data']) for row in rows]
+
+
+class HTTPCrawlQueue(CrawlQueue):
+    """Backend réseau: client d'un QueueServer (voir serve_queue)"""
+
+    def __init__(self, server_url: str, token: Optional[str] = None, timeout: float = 30):
+        self.server_url = server_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        token = token or os.environ.get(TOKEN_ENV)
+        if token:
+            self.session.headers[TOKEN_HEADER] = token
+
+    def _call(self, method: str, payload: Optional[Dict] = None):
+        response = self.session.post(f"{self.server_url}/{method}", json=payload or {}, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()['result']
+
+    def put(self, tasks: List[Dict], reset: bool = False) -> int:
+        return self._call('put', {'tasks': tasks, 'reset': reset})
+
+    def lease(self, worker_id: str, lease_seconds: float = 120) -> Optional[Dict]:
+        return self._call('lease', {'worker_id': worker_id, 'lease_seconds': lease_seconds})
+
+    def complete(self, task_key: str, token: str, listings: List[Dict],
+                 new_tasks: Optional[List[Dict]] = None) -> Optional[int]:
+        return self._call('complete', {
+            'task_key': task_key, 'token': token, 'listings': listings, 'new_tasks': new_tasks or []
+        })
+
+    def fail(self, task_key: str, token: str, error: str) -> bool:
+        return self._call('fail', {'task_key': task_key, 'token': token, 'error': error})
+
+    def stats(self) -> Dict:
+        return self._call('stats')
+
+
+def make_queue_server(queue: CrawlQueue, token: str, host: str = '127.0.0.1',
+                      port: int = 8765) -> ThreadingHTTPServer:
+    """Serveur HTTP/JSON exposant une file (typiquement SQLite) aux workers distants
+
+    Chaque requête doit porter le jeton partagé dans l'en-tête TOKEN_HEADER.
+    Par défaut le serveur n'écoute que la machine locale: passer host='0.0.0.0'
+    pour des workers sur d'autres machines.
+    """
+    if not token:
+        raise ValueError("Un jeton est requis pour servir la file")
+    expected = token.encode('utf-8')
+    methods = {
+        'put': lambda p: queue.put(p['tasks'], p.get('reset', False)),
+        'lease': lambda p: queue.lease(p['worker_id'], p.get('lease_seconds', 120)),
+        'complete': lambda p: queue.complete(p['task_key'], p['token'], p['listings'], p.get('new_tasks')),
+        'fail': lambda p: queue.fail(p['task_key'], p['token'], p['error']),
+        'stats': lambda p: queue.stats()
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            received = self.headers.get(TOKEN_HEADER, '').encode('utf-8')
+            if not hmac.compare_digest(received, expected):
+                self._reply(401, {'error': "Jeton invalide"})
+                return
+            method = methods.get(self.path.strip('/'))
+            if method is None:
+                self._reply(404, {'error': f"Méthode inconnue: {self.path}"})
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                self._reply(200, {'result': method(payload)})
+            except Exception as e:
+                self._reply(500, {'error': str(e)})
+
+        def _reply(self, status: int, body: Dict):
+            data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+class CrawlWorker:
+    """Worker qui réserve des tâches, scrape les pages et renvoie les annonces à la file"""
+
+    def __init__(self, queue: CrawlQueue, worker_id: Optional[str] = None,
+                 transport: Optional[str] = None, base_url: str = "https://sn.coinafrique.com",
+                 lease_seconds: float = 120, poll_interval: float = 5):
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.transport = transport
+        self.base_url = base_url
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.stop_event = threading.Event()
+        self._scrapers = {}
+
+    def scraper_for(self, mode: str):
+        if mode not in self._scrapers:
+            self._scrapers[mode] = SCRAPER_CLASSES[mode](
+                base_url=self.base_url, silent=True, transport=get_transport(self.transport)
+            )
+        return self._scrapers[mode]
+
+    def handle_page(self, task: Dict) -> Tuple[List[Dict], List[Dict]]:
+        """Scrape une page; retourne (annonces, nouvelles tâches)"""
+        scraper = self.scraper_for(task['mode'])
+        scraper.errors.clear()
+
+        soup = scraper.get_page_content(scraper.category_urls[task['category']], task['page'])
+        if soup is None:
+            raise RuntimeError(scraper.errors[-1] if scraper.errors else "Page indisponible")
+
+        cards = scraper.parse_cards(soup)
+        records = scraper.build_records(cards, task['category'])
+
+        if task['mode'] == 'both':
+            pairs = [pair for pair in records if pair['cleaned'] is not None]
+            outputs = [(pair['cleaned'], 'cleaned', pair['cleaned']) for pair in pairs]
+            outputs += [(pair['cleaned'], 'raw', pair['raw']) for pair in pairs if pair['raw'] is not None]
+        else:
+            outputs = [(record, task['mode'], record) for record in records]
+
+        listings = [
+            {'listing_key': listing_key(key_record), 'mode': mode, 'category': task['category'], 'data': record}
+            for key_record, mode, record in outputs
+        ]
+
+        new_tasks = []
+        if task['discover'] and cards:
+            last_page = scraper.find_last_page(soup) or task['page'] + 1
+            new_tasks = [
+                page_task(task['category'], page, task['mode'], discover=True, run=task.get('run', ""))
+                for page in range(task['page'] + 1, last_page + 1)
+            ]
+        return listings, new_tasks
+
+    def run_once(self) -> Optional[Dict]:
+        """Traite une tâche; retourne un rapport ou None si la file est vide"""
+        task = self.queue.lease(self.worker_id, self.lease_seconds)
+        if task is None:
+            return None
+
+        try:
+            if task['kind'] != 'page':
+                raise ValueError(f"Type de tâche non supporté: {task['kind']}")
+            listings, new_tasks = self.handle_page(task)
+        except Exception as e:
+            self.queue.fail(task['task_key'], task['lease_token'], str(e))
+            return {'task_key': task['task_key'], 'status': 'erreur', 'error': str(e)}
+
+        inserted = self.queue.complete(task['task_key'], task['lease_token'], listings, new_tasks)
+        return {
+            'task_key': task['task_key'],
+            'status': 'ignorée (réservation expirée)' if inserted is None else 'terminée',
+            'listings': len(listings),
+            'new_listings': inserted or 0
+        }
+
+    def run(self, exit_when_idle: bool = True, on_report=None) -> None:
+        while not self.stop_event.is_set():
+            report = self.run_once()
+            if report is None:
+                stats = self.queue.stats()['tasks']
+                if exit_when_idle and not stats[PENDING] and not stats[LEASED]:
+                    break
+                self.stop_event.wait(self.poll_interval)
+                continue
+            if on_report:
+                on_report(report)
+            # Politesse: une requête par seconde et par worker
+            self.stop_event.wait(1)
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+
+def export_listings(queue: SQLiteCrawlQueue, mode: str) -> List[str]:
+    """Écrit les annonces fusionnées dans data/<mode>/, un fichier par catégorie"""
+    from scrapers.base import CoinAfriqueScraperBase
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    saver = CoinAfriqueScraperBase(silent=True)
+    paths = []
+    for category in saver.category_urls:
+        data = queue.iter_listings(mode, category)
+        filepath = saver.save_to_csv(data, f"{category}_{mode}_{timestamp}.csv", mode=mode)
+        if filepath:
+            paths.append(filepath)
+    return paths
+
+
+def open_queue(args) -> CrawlQueue:
+    if getattr(args, 'server', None):
+        return HTTPCrawlQueue(args.server, args.token)
+    return SQLiteCrawlQueue(args.db)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="File de scraping distribuée CoinAfrique")
+    parser.add_argument('--db', default=QUEUE_PATH, help="Fichier SQLite de la file")
+    parser.add_argument('--token', default=os.environ.get(TOKEN_ENV),
+                        help=f"Jeton partagé du serveur de file (défaut: ${TOKEN_ENV})")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    seed = subparsers.add_parser('seed', help="Ajoute les pages de catégories à scraper")
+    seed.add_argument('--server', help="URL d'un serveur de file (sinon --db)")
+    seed.add_argument('--categories', nargs='+', default=['villas', 'terrains', 'appartements'])
+    seed.add_argument('--mode', choices=sorted(SCRAPER_CLASSES), default='cleaned')
+    seed.add_argument('--pages', type=int, default=1)
+    seed.add_argument('--all-pages', action='store_true', help="Découvre les pages via la pagination")
+    seed.add_argument('--reset', action='store_true',
+                      help="Relance les pages déjà scrapées ou en échec (nouveau passage)")
+
+    work = subparsers.add_parser('work', help="Lance un worker")
+    work.add_argument('--server', help="URL d'un serveur de file (sinon --db)")
+    work.add_argument('--worker-id')
+    work.add_argument('--transport', choices=sorted(TRANSPORTS))
+    work.add_argument('--base-url', default="https://sn.coinafrique.com")
+    work.add_argument('--lease-seconds', type=float, default=120)
+    work.add_argument('--forever', action='store_true', help="Attend de nouvelles tâches au lieu de s'arrêter")
+
+    serve = subparsers.add_parser('serve', help="Expose la file SQLite aux workers distants")
+    serve.add_argument('--host', default='127.0.0.1', help="0.0.0.0 pour accepter les workers distants")
+    serve.add_argument('--port', type=int, default=8765)
+
+    stats = subparsers.add_parser('stats', help="État de la file")
+    stats.add_argument('--server', help="URL d'un serveur de file (sinon --db)")
+
+    export = subparsers.add_parser('export', help="Exporte les annonces fusionnées en CSV")
+    export.add_argument('--mode', choices=['cleaned', 'raw'], default='cleaned')
+
+    args = parser.parse_args()
+
+    if args.command == 'seed':
+        run = new_run_id()
+        if args.all_pages:
+            tasks = [page_task(c, 1, args.mode, discover=True, run=run) for c in args.categories]
+        else:
+            tasks = [page_task(c, p, args.mode, run=run) for c in args.categories for p in range(1, args.pages + 1)]
+        print(f"{open_queue(args).put(tasks, reset=args.reset)} tâches ajoutées (passage {run})")
+
+    elif args.command == 'work':
+        worker = CrawlWorker(
+            open_queue(args), worker_id=args.worker_id, transport=args.transport,
+            base_url=args.base_url, lease_seconds=args.lease_seconds
+        )
+        try:
+            worker.run(
+                exit_when_idle=not args.forever,
+                on_report=lambda r: print(f"[{worker.worker_id}] {r['task_key']}: {r['status']} "
+                                          f"{r.get('new_listings', '')} {r.get('error', '')}")
+            )
+        except KeyboardInterrupt:
+            worker.stop()
+
+    elif args.command == 'serve':
+        token = args.token or secrets.token_urlsafe(24)
+        server = make_queue_server(SQLiteCrawlQueue(args.db), token, args.host, args.port)
+        print(f"File servie sur http://{args.host}:{args.port}")
+        if not args.token:
+            print(f"Jeton généré (à passer aux workers via --token ou ${TOKEN_ENV}): {token}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.shutdown()
+
+    elif args.command == 'stats':
+        print(json.dumps(open_queue(args).stats(), indent=2))
+
+    elif args.command == 'export':
+        for filepath in export_listings(SQLiteCrawlQueue(args.db), args.mode):
+            print(filepath)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import re
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from scrapers.scheduler import AdaptiveScheduler
+
+
+class FakeClock:
+    """Horloge factice: sleep() avance le temps sans attendre"""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class FakeSite:
+    """Pages de catégories CoinAfrique servies en local (une seule page par catégorie)"""
+
+    def __init__(self):
+        self.listings = {'villas': [], 'terrains': []}
+        self.requests = []
+        self._next_id = 1
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                match = re.match(r'/categorie/(\w+)(?:\?page=(\d+))?', self.path)
+                category, page = match.group(1), int(match.group(2) or 1)
+                site.requests.append((category, page))
+                ids = site.listings.get(category, []) if page == 1 else []
+                cards = ''.join(
+                    f'<div><a href="/annonce/{category}/{i}">Annonce {i}</a>'
+                    f'<img src="/thumb_{i}.jpg" alt="Villa 4 pièces Almadies">'
+                    f'<p>{50 + i} 000 000 CFA</p></div>'
+                    for i in ids
+                )
+                body = f'<html><body>{cards}</body></html>'.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def publish(self, category: str, count: int) -> None:
+        for _ in range(count):
+            self.listings[category].insert(0, self._next_id)
+            self._next_id += 1
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class AdaptiveSchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.site = FakeSite()
+        self.addCleanup(self.site.close)
+        self.site.publish('villas', 4)
+        self.site.publish('terrains', 4)
+        self.clock = FakeClock()
+        self.scheduler = AdaptiveScheduler(
+            categories=['villas', 'terrains'], base_url=self.site.url, initial_interval=1800,
+            min_interval=900, max_interval=24 * 3600, state_path=None, save_results=False,
+            clock=self.clock, sleep=self.clock.sleep
+        )
+
+    def run_next(self):
+        """Avance l'horloge jusqu'à la prochaine échéance et exécute les catégories dues"""
+        self.clock.sleep(self.scheduler.seconds_until_next_run())
+        return {report['category']: report for report in self.scheduler.run_pending()}
+
+    def test_first_run_only_records_seen_listings(self):
+        reports = self.run_next()
+
+        self.assertEqual(set(reports), {'villas', 'terrains'})
+        self.assertEqual(reports['terrains']['new_listings'], 4)
+        for category in ('villas', 'terrains'):
+            schedule = self.scheduler.schedules[category]
+            self.assertEqual(schedule.interval, 1800)
+            self.assertIsNone(schedule.new_ratio)
+            self.assertEqual(len(schedule.seen), 4)
+            self.assertEqual(schedule.next_run, self.clock.now + 1800)
+
+    def test_quiet_category_is_visited_less_often(self):
+        self.run_next()
+        intervals = []
+        for _ in range(3):
+            self.run_next()
+            intervals.append(self.scheduler.schedules['terrains'].interval)
+
+        self.assertEqual(intervals, [3600, 7200, 14400])
+        self.assertEqual(self.scheduler.schedules['terrains'].new_ratio, 0)
+
+    def test_busy_category_is_visited_more_often(self):
+        self.run_next()
+        self.site.publish('villas', 4)
+        reports = self.run_next()
+
+        self.assertEqual(reports['villas']['new_listings'], 4)
+        self.assertEqual(reports['villas']['listings'], 8)
+        self.assertAlmostEqual(self.scheduler.schedules['villas'].interval, 1080)
+        self.assertEqual(self.scheduler.schedules['terrains'].interval, 3600)
+
+        # villas revient à échéance avant terrains
+        self.site.publish('villas', 8)
+        reports = self.run_next()
+        self.assertEqual(set(reports), {'villas'})
+        self.assertEqual(self.scheduler.schedules['villas'].interval, 900)
+
+    def test_nothing_runs_before_the_next_deadline(self):
+        self.run_next()
+        requests_made = len(self.site.requests)
+        self.clock.sleep(1799)
+
+        self.assertEqual(self.scheduler.run_pending(), [])
+        self.assertEqual(len(self.site.requests), requests_made)
+
+    def test_run_forever_sleeps_on_the_injected_clock(self):
+        started = self.clock.now
+        self.scheduler.run_forever(max_cycles=3)
+
+        # Premier passage immédiat, puis réveils aux échéances suivantes (après 1800 s, puis 3600 s)
+        self.assertEqual(self.clock.now - started, 1800 + 3600)
+        self.assertEqual(self.site.requests.count(('villas', 1)), 3)
+
@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+
+from scrapers.work_queue import SQLiteCrawlQueue, page_task, PENDING, LEASED, DONE
+
+
+class FakeClock:
+    """Horloge factice avancée à la main"""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def listing(key: str, price: str = "50 000 000 CFA") -> dict:
+    return {'listing_key': key, 'mode': 'cleaned', 'category': 'villas',
+            'data': {'lien_annonce': key, 'prix': price}}
+
+
+class SQLiteCrawlQueueTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.clock = FakeClock()
+        self.queue = SQLiteCrawlQueue(os.path.join(tmp.name, 'queue.db'), clock=self.clock)
+        self.queue.put([page_task('villas', 1, run='run-1')])
+
+    def test_expired_lease_is_taken_over(self):
+        first = self.queue.lease('worker-1', lease_seconds=120)
+        self.assertIsNone(self.queue.lease('worker-2', lease_seconds=120))
+
+        self.clock.now += 121
+        second = self.queue.lease('worker-2', lease_seconds=120)
+
+        self.assertEqual(second['task_key'], first['task_key'])
+        self.assertEqual(second['lease_owner'], 'worker-2')
+        self.assertNotEqual(second['lease_token'], first['lease_token'])
+        self.assertEqual(second['attempts'], 2)
+        self.assertEqual(self.queue.stats()['tasks'][LEASED], 1)
+
+    def test_complete_with_stale_token_is_ignored(self):
+        first = self.queue.lease('worker-1', lease_seconds=120)
+        self.clock.now += 121
+        second = self.queue.lease('worker-2', lease_seconds=120)
+
+        self.assertIsNone(self.queue.complete(first['task_key'], first['lease_token'], [listing('/annonce/1')]))
+        self.assertFalse(self.queue.fail(first['task_key'], first['lease_token'], "trop tard"))
+        self.assertEqual(self.queue.stats()['listings'], {})
+
+        self.assertEqual(self.queue.complete(second['task_key'], second['lease_token'], [listing('/annonce/1')]), 1)
+        self.assertEqual(self.queue.stats()['tasks'][DONE], 1)
+
+    def test_reseed_with_reset_starts_a_new_run(self):
+        task = self.queue.lease('worker-1')
+        self.queue.complete(task['task_key'], task['lease_token'], [listing('/annonce/1'), listing('/annonce/2')])
+
+        # Même clé de tâche: ignorée sans reset, ou pour le même passage
+        self.assertEqual(self.queue.put([page_task('villas', 1, run='run-2')]), 0)
+        self.assertEqual(self.queue.put([page_task('villas', 1, run='run-1')], reset=True), 0)
+
+        self.assertEqual(self.queue.put([page_task('villas', 1, run='run-2')], reset=True), 1)
+        self.assertEqual(self.queue.stats()['tasks'][PENDING], 1)
+
+        task = self.queue.lease('worker-1')
+        self.assertEqual((task['run'], task['attempts']), ('run-2', 1))
+        # Annonce revue au nouveau passage: mise à jour et comptée, sans doublon
+        inserted = self.queue.complete(task['task_key'], task['lease_token'],
+                                       [listing('/annonce/1', "45 000 000 CFA"), listing('/annonce/3')])
+        self.assertEqual(inserted, 2)
+        self.assertEqual(
+            [record['prix'] for record in self.queue.iter_listings('cleaned')],
+            ["45 000 000 CFA", "50 000 000 CFA", "50 000 000 CFA"]
+        )
+